@@ -3,12 +3,14 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from .utils import ok, bad
+from .threadpool import ThreadpoolTimedRoute
 from .cognito_client import get_cognito_client
+from .notifications import get_subscription_service
 
 # Authentication routes and helpers (Cognito-backed auth)
 
 security = HTTPBearer()
-router = APIRouter(prefix="/auth", tags=["Auth"])
+router = APIRouter(prefix="/auth", tags=["Auth"], route_class=ThreadpoolTimedRoute)
 COGNITO_CONFIGURED = (
     os.getenv('AWS_COGNITO_USER_POOL_ID') is not None and
     os.getenv('AWS_COGNITO_CLIENT_ID') is not None
@@ -25,6 +27,43 @@ class LoginBody(BaseModel):
     email: str
     password: str
 
+class RefreshBody(BaseModel):
+    refresh_token: str
+
+class AuthenticatedUser(dict):
+    # Token claims for the current principal; profile attributes missing from the
+    # access token (email, name, ...) are fetched from Cognito on first access only
+    PROFILE_ATTRIBUTES = {'email', 'name', 'given_name', 'family_name', 'phone_number', 'email_verified'}
+
+    def __init__(self, claims: dict, access_token: str):
+        super().__init__(claims)
+        self._access_token = access_token
+        self._profile_loaded = False
+
+    def _load_profile(self):
+        # merge cached Cognito attributes into the claims without overriding them
+        self._profile_loaded = True
+        try:
+            profile = get_cognito_client().get_user_profile(dict.get(self, 'sub'), self._access_token)
+        except Exception as e:
+            print(f"Profile lookup failed: {e}")
+            return
+        for key, value in profile.items():
+            self.setdefault(key, value)
+
+    def _needs_profile(self, key) -> bool:
+        return key in self.PROFILE_ATTRIBUTES and not self._profile_loaded and not dict.__contains__(self, key)
+
+    def __getitem__(self, key):
+        if self._needs_profile(key):
+            self._load_profile()
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        if self._needs_profile(key):
+            self._load_profile()
+        return super().get(key, default)
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     # Dependency to validate bearer token and return the authenticated user
     if not COGNITO_CONFIGURED:
@@ -44,7 +83,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        return result['user']
+        return AuthenticatedUser(result['user'], credentials.credentials)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,7 +93,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
 
 @router.post("/signup")
 def signup(body: SignupBody):
-    # Register a new user in Cognito and optionally subscribe them to SNS
+    # Register a new user in Cognito and queue their SNS subscription
     if not COGNITO_CONFIGURED:
         return bad(503, "SERVICE_UNAVAILABLE", "Authentication service not configured")
     
@@ -68,28 +107,8 @@ def signup(body: SignupBody):
         )
         
         if result['success']:
-            try:
-                import boto3
-                import os
-                sns_client = boto3.client(
-                    'sns',
-                    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                    region_name=os.getenv('AWS_SNS_REGION', 'us-east-1')
-                )
-                
-                topic_name = os.getenv('AWS_SNS_TOPIC_NAME', 'product-notifications')
-                topic_response = sns_client.create_topic(Name=topic_name)
-                topic_arn = topic_response['TopicArn']
-                
-                sns_client.subscribe(
-                    TopicArn=topic_arn,
-                    Protocol='email',
-                    Endpoint=body.email
-                )
-                
-            except Exception as sns_error:
-                pass
+            # subscription to product notifications happens in the background
+            get_subscription_service().subscribe(body.email)
             
             return ok(result['message'], {
                 "token": result.get('token'),
@@ -123,4 +142,27 @@ def login(body: LoginBody):
             return bad(401, result.get('error', 'LOGIN_FAILED'), result['message'])
                 
     except Exception as e:
-        return bad(500, "LOGIN_EXCEPTION", "Unexpected error during login", str(e))
\ No newline at end of file
+        return bad(500, "LOGIN_EXCEPTION", "Unexpected error during login", str(e))
+
+@router.post("/refresh")
+def refresh(body: RefreshBody):
+    # Exchange a refresh token for a new access token without re-sending the password
+    if not COGNITO_CONFIGURED:
+        return bad(503, "SERVICE_UNAVAILABLE", "Authentication service not configured")
+    
+    try:
+        cognito = get_cognito_client()
+        result = cognito.refresh(body.refresh_token)
+        
+        if result['success']:
+            return ok(result['message'], {
+                "token": result['token'],
+                "refresh_token": result.get('refresh_token'),
+                "expires_in": result.get('expires_in'),
+                "user": result['user']
+            })
+        else:
+            return bad(401, result.get('error', 'REFRESH_FAILED'), result['message'])
+                
+    except Exception as e:
+        return bad(500, "REFRESH_EXCEPTION", "Unexpected error during token refresh", str(e))
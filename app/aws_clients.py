@@ -0,0 +1,116 @@
+import os
+import threading
+import boto3
+from typing import Any, Dict, List, Optional, Tuple
+from botocore.config import Config
+from .metrics import registry
+
+# Shared boto3 clients/resources: one per (service, region), built with a tuned botocore Config
+
+_session = None
+_clients = {}
+_resources = {}
+_lock = threading.Lock()
+
+
+def client_config(service: str) -> Config:
+    # connection pool sized for our concurrency (botocore defaults to 10), adaptive retries, keepalive
+    pool_size = os.getenv(f"AWS_{service.upper().replace('-', '_')}_MAX_POOL_CONNECTIONS",
+                          os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+    return Config(
+        max_pool_connections=int(pool_size),
+        retries={
+            'mode': os.getenv('AWS_RETRY_MODE', 'adaptive'),
+            'max_attempts': int(os.getenv('AWS_MAX_ATTEMPTS', '5'))
+        },
+        tcp_keepalive=True,
+        connect_timeout=float(os.getenv('AWS_CONNECT_TIMEOUT', '5')),
+        # must stay above the 20s SQS long-poll wait
+        read_timeout=float(os.getenv('AWS_READ_TIMEOUT', '60'))
+    )
+
+
+def _get_session() -> boto3.session.Session:
+    # boto3's default session is not thread-safe to build clients from, so keep our own (under _lock)
+    global _session
+    if _session is None:
+        _session = boto3.session.Session(
+            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY')
+        )
+    return _session
+
+
+def get_client(service: str, region: Optional[str] = None):
+    # return the shared low-level client for a service/region (clients are thread-safe)
+    key = (service, region or os.getenv('AWS_REGION', 'us-east-1'))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _get_session().client(
+                    service, region_name=key[1], config=client_config(service)
+                )
+    return client
+
+
+def get_resource(service: str, region: Optional[str] = None):
+    # return the shared resource for a service/region, built with the same tuned config
+    key = (service, region or os.getenv('AWS_REGION', 'us-east-1'))
+    resource = _resources.get(key)
+    if resource is None:
+        with _lock:
+            resource = _resources.get(key)
+            if resource is None:
+                resource = _resources[key] = _get_session().resource(
+                    service, region_name=key[1], config=client_config(service)
+                )
+    return resource
+
+
+def _connection_pools(client) -> List[Tuple[str, Any]]:
+    # (host, urllib3 pool) pairs behind a client; relies on botocore internals, so failures yield nothing
+    try:
+        manager = client._endpoint.http_session._manager
+        with manager.pools.lock:
+            pools = list(manager.pools._container.values())
+        return [(pool.host, pool) for pool in pools]
+    except Exception:
+        return []
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    # per client and host: pool size, connections checked out, idle connections, connections opened
+    with _lock:
+        clients = [(service, region, client) for (service, region), client in _clients.items()]
+        clients += [(service, region, resource.meta.client) for (service, region), resource in _resources.items()]
+
+    stats = []
+    for service, region, client in clients:
+        for host, pool in _connection_pools(client):
+            # the queue is pre-filled with placeholders, so checked-out = maxsize - qsize
+            queued = list(pool.pool.queue)
+            stats.append({
+                'service': service,
+                'region': region,
+                'host': host,
+                'max_connections': pool.pool.maxsize,
+                'in_use': pool.pool.maxsize - len(queued),
+                'idle': sum(1 for conn in queued if conn is not None),
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests
+            })
+    return stats
+
+
+def _pool_gauge(field: str):
+    def read():
+        return [({'service': s['service'], 'region': s['region'], 'host': s['host']}, s[field]) for s in pool_stats()]
+    return read
+
+
+registry.gauge("aws_pool_max_connections", "Connection pool size per AWS client and host", _pool_gauge('max_connections'))
+registry.gauge("aws_pool_in_use", "Connections currently checked out per AWS client and host", _pool_gauge('in_use'))
+registry.gauge("aws_pool_idle", "Open idle connections per AWS client and host", _pool_gauge('idle'))
+registry.gauge("aws_pool_connections_opened", "Connections opened so far per AWS client and host", _pool_gauge('connections_opened'))
@@ -1,9 +1,10 @@
-import boto3
 import os
 import jwt
 import requests
 from typing import Dict, Any
 from dotenv import load_dotenv
+from .cache import TTLCache
+from .aws_clients import get_client
 
 load_dotenv()
 
@@ -15,13 +16,13 @@ class CognitoClient:
         self.user_pool_id = os.getenv('AWS_COGNITO_USER_POOL_ID')
         self.client_id = os.getenv('AWS_COGNITO_CLIENT_ID')
         
-        self.cognito = boto3.client(
-            'cognito-idp',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=self.region
-        )
+        self.cognito = get_client('cognito-idp', self.region)
         self._jwks = None
+        # user attributes per sub, so GetUser runs roughly once per user per TTL
+        self._profiles = TTLCache(
+            maxsize=int(os.getenv('COGNITO_PROFILE_CACHE_SIZE', '10000')),
+            ttl=float(os.getenv('COGNITO_PROFILE_CACHE_TTL', '3600'))
+        )
         
     def get_jwks(self):
         # fetch and cache JWKS for token verification
@@ -85,6 +86,45 @@ class CognitoClient:
         except Exception as e:
             return {'success': False, 'message': str(e), 'error': str(e)}
     
+    def refresh(self, refresh_token: str) -> Dict[str, Any]:
+        # exchange a refresh token for fresh access/id tokens (REFRESH_TOKEN_AUTH)
+        try:
+            response = self.cognito.initiate_auth(
+                ClientId=self.client_id,
+                AuthFlow='REFRESH_TOKEN_AUTH',
+                AuthParameters={'REFRESH_TOKEN': refresh_token}
+            )
+            auth_result = response['AuthenticationResult']
+            
+            # id token comes straight from Cognito, so its claims are only read, not re-verified
+            claims = jwt.decode(auth_result['IdToken'], options={'verify_signature': False})
+            
+            return {
+                'success': True,
+                'message': 'Token refreshed',
+                'token': auth_result['AccessToken'],
+                'id_token': auth_result['IdToken'],
+                # Cognito does not rotate refresh tokens for this flow; hand back the one we got
+                'refresh_token': auth_result.get('RefreshToken', refresh_token),
+                'expires_in': auth_result.get('ExpiresIn', 3600),
+                'user': {'email': claims.get('email')}
+            }
+        except Exception as e:
+            return {'success': False, 'message': str(e), 'error': str(e)}
+    
+    def get_user_profile(self, sub: str, access_token: str) -> Dict[str, Any]:
+        # return the user's attributes (email, name, ...) using a per-sub TTL cache
+        profile = self._profiles.get(sub) if sub else None
+        if profile is not None:
+            return profile
+        
+        response = self.cognito.get_user(AccessToken=access_token)
+        profile = {attr['Name']: attr['Value'] for attr in response.get('UserAttributes', [])}
+        profile.setdefault('username', response.get('Username'))
+        if sub:
+            self._profiles.set(sub, profile)
+        return profile
+    
     def verify_token(self, token: str) -> Dict[str, Any]:
         # verify a JWT token using the Cognito JWKS and return the payload
         try:
@@ -1,10 +1,13 @@
-import boto3
 import uuid
 import os
+import time
+import queue
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Iterator
 from decimal import Decimal
 from dotenv import load_dotenv
+from .aws_clients import get_resource
 
 load_dotenv()
 
@@ -12,12 +15,7 @@ load_dotenv()
 
 class DynamoDBClient:
     def __init__(self):
-        self.dynamodb = boto3.resource(
-            'dynamodb',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
+        self.dynamodb = get_resource('dynamodb', os.getenv('AWS_REGION', 'us-east-1'))
         table_name = os.getenv('AWS_DYNAMODB_TABLE_NAME', 'inventory_products')
         self.inventory_products = self.dynamodb.Table(table_name)
     
@@ -53,6 +51,35 @@ class DynamoDBClient:
         self.inventory_products.put_item(Item=self._prepare_item(item))
         return self._convert_decimals(item)
     
+    def batch_create_products(self, products: List[Dict], max_attempts: int = 5) -> int:
+        # write many new products with BatchWriteItem (25 per call), retrying unprocessed items
+        timestamp = datetime.now().isoformat()
+        requests = [{
+            'PutRequest': {
+                'Item': self._prepare_item({
+                    'id': str(uuid.uuid4()),
+                    'created_at': timestamp,
+                    'updated_at': timestamp,
+                    **product_data
+                })
+            }
+        } for product_data in products]
+        
+        client = self.dynamodb.meta.client
+        table_name = self.inventory_products.name
+        for start in range(0, len(requests), 25):
+            pending = requests[start:start + 25]
+            attempt = 0
+            while pending:
+                response = client.batch_write_item(RequestItems={table_name: pending})
+                pending = response.get('UnprocessedItems', {}).get(table_name, [])
+                if pending:
+                    attempt += 1
+                    if attempt >= max_attempts:
+                        raise RuntimeError(f"{len(pending)} items left unprocessed after {attempt} attempts")
+                    time.sleep(min(0.05 * (2 ** attempt), 2))
+        return len(requests)
+    
     def get_product_by_id(self, product_id: str) -> Optional[Dict]:
         # fetch a product by id from DynamoDB
         response = self.inventory_products.get_item(Key={'id': product_id})
@@ -63,6 +90,61 @@ class DynamoDBClient:
         response = self.inventory_products.scan(Limit=limit)
         return self._convert_decimals(response.get('Items', []))
     
+    def parallel_scan(self, total_segments: int = 4, page_size: int = 1000) -> Iterator[Dict]:
+        # scan the whole table with one thread per segment, yielding items as pages arrive
+        client = self.dynamodb.meta.client
+        table_name = self.inventory_products.name
+        # a small bound keeps memory flat when the consumer is slower than the scanners
+        pages = queue.Queue(maxsize=total_segments * 2)
+        done = object()
+        stop = threading.Event()
+        
+        def put(page):
+            # give up if the consumer went away, instead of blocking on a full queue forever
+            while not stop.is_set():
+                try:
+                    pages.put(page, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+        
+        def scan_segment(segment: int):
+            try:
+                params = {
+                    'TableName': table_name,
+                    'Segment': segment,
+                    'TotalSegments': total_segments,
+                    'Limit': page_size
+                }
+                while not stop.is_set():
+                    response = client.scan(**params)
+                    put(response.get('Items', []))
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            except Exception as e:
+                put(e)
+            finally:
+                put(done)
+        
+        for segment in range(total_segments):
+            threading.Thread(target=scan_segment, args=(segment,), daemon=True).start()
+        
+        finished = 0
+        try:
+            while finished < total_segments:
+                page = pages.get()
+                if page is done:
+                    finished += 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    for item in page:
+                        # the resource's client already unmarshals attribute values; only Decimals remain
+                        yield self._convert_decimals(item)
+        finally:
+            stop.set()
+    
     def update_product(self, product_id: str, updates: Dict) -> Optional[Dict]:
         # update specific fields on a product and return the new item
         updates['updated_at'] = datetime.now().isoformat()
@@ -1,10 +1,16 @@
 
 # this is the FastAPI application entrypoint for the Inventory backend
+import os
+import asyncio
 from pathlib import Path
 from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from . import auth, products, s3_routes
+from .rate_limit import AdmissionControlMiddleware
+from .metrics import registry
+from .threadpool import configure_threadpool
 
 load_dotenv(dotenv_path=Path(__file__).resolve().parents[1] / ".env", override=True)
 
@@ -14,6 +20,9 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# added before CORS so rejected requests still carry CORS headers
+app.add_middleware(AdmissionControlMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -40,13 +49,42 @@ async def health():
     # detailed health check: returns ok when service is healthy
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus-style metrics for threadpool saturation and other in-process counters
+    return registry.render()
+
 @app.on_event("startup")
 async def startup():
-    # startup event: attempt to start background worker for queue processing
+    # startup event: size the threadpool, then attempt to start background worker for queue processing
+    print(f"Threadpool capacity: {configure_threadpool()} workers")
+    
     try:
         from .sqs.worker import start_background_worker
-        import asyncio
         asyncio.create_task(start_background_worker(batch_size=10, polling_interval=5))
         print("Background worker started for SQS/SNS notifications")
     except Exception as e:
-        print(f"Background worker not started: {e}")
\ No newline at end of file
+        print(f"Background worker not started: {e}")
+    
+    # periodic catalog snapshots, off unless SNAPSHOT_INTERVAL_SECONDS is set
+    interval = int(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "0"))
+    if interval > 0 and s3_routes.snapshot_service:
+        asyncio.create_task(_snapshot_loop(interval))
+        print(f"Catalog snapshots scheduled every {interval}s")
+
+@app.on_event("shutdown")
+async def shutdown():
+    # shutdown event: stop the queue pollers, then flush notifications still buffered for SQS
+    try:
+        from .sqs.worker import stop_background_worker
+        stop_background_worker()
+        from .notifications import get_notification_service
+        await asyncio.to_thread(get_notification_service().close)
+    except Exception as e:
+        print(f"Notification shutdown failed: {e}")
+
+async def _snapshot_loop(interval: int):
+    # kick off a background snapshot every interval; a run still in progress is left alone
+    while True:
+        await asyncio.sleep(interval)
+        s3_routes.snapshot_service.start_snapshot()
\ No newline at end of file
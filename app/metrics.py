@@ -0,0 +1,158 @@
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Minimal in-process metrics (counters, gauges, histograms) exported in Prometheus text format
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> Tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(key: Tuple, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    # monotonically increasing value per label set
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, labels: Optional[Dict[str, str]] = None):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, labels: Optional[Dict[str, str]] = None) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in items]
+
+
+class Gauge:
+    # point-in-time value, either set explicitly or read from a callback at export time;
+    # a callback may also return a list of (labels, value) pairs for a labelled series
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, callback: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.description = description
+        self.callback = callback
+        self._values = {}
+
+    def set(self, value: float, labels: Optional[Dict[str, str]] = None):
+        self._values[_label_key(labels)] = value
+
+    def inc(self, amount: float = 1, labels: Optional[Dict[str, str]] = None):
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, labels: Optional[Dict[str, str]] = None):
+        self.inc(-amount, labels)
+
+    def value(self, labels: Optional[Dict[str, str]] = None) -> float:
+        if self.callback is not None:
+            return self.callback()
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> List[str]:
+        if self.callback is not None:
+            try:
+                result = self.callback()
+            except Exception:
+                return []
+            if isinstance(result, list):
+                return [f"{self.name}{_format_labels(_label_key(labels))} {value}" for labels, value in result]
+            return [f"{self.name} {result}"]
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in list(self._values.items())]
+
+
+class Histogram:
+    # cumulative bucketed observations with sum and count per label set
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Optional[Dict[str, str]] = None):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self, labels: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        series = self._series.get(_label_key(labels))
+        if not series:
+            return {"count": 0, "sum": 0.0}
+        return {"count": series["count"], "sum": series["sum"]}
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(key, list(s["counts"]), s["sum"], s["count"]) for key, s in self._series.items()]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', str(bound))])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    # holds named metrics; registering an existing name returns the existing metric
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, description: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description, **kwargs)
+            return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter, name, description)
+
+    def gauge(self, name: str, description: str, callback: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge, name, description, callback=callback)
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, description, buckets=buckets)
+
+    def render(self) -> str:
+        # render every metric in Prometheus text exposition format
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
@@ -1,5 +1,13 @@
 
 # Notifications package exports
 from .notification_service import NotificationService, get_notification_service
+from .subscription_service import SubscriptionService, get_subscription_service
+from .outbox import NotificationOutbox
 
-__all__ = ['NotificationService', 'get_notification_service']
+__all__ = [
+    'NotificationService',
+    'get_notification_service',
+    'SubscriptionService',
+    'get_subscription_service',
+    'NotificationOutbox'
+]
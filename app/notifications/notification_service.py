@@ -1,6 +1,5 @@
 import os
-import boto3
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,32 +10,57 @@ load_dotenv(dotenv_path=Path(__file__).resolve().parents[2] / ".env", override=T
 class NotificationService:
     # NotificationService: prepares and enqueues notifications for downstream delivery
     def __init__(self):
-        # initialize the SQS-backed notification queue client
+        # initialize the SQS-backed notification queue client and the outbox that feeds it
         from ..sqs.notification_queue import NotificationQueueService
+        from .outbox import NotificationOutbox
         self.queue = NotificationQueueService()
+        self.outbox = NotificationOutbox(self._enqueue)
 
-    def notify(self, action: str, resource: str, data: Dict[str, Any], priority="normal"):
-        # format a human-readable notification and enqueue it; returns True on success, False on failure
-        try:
-            name = data.get('name', data.get('id', 'Item'))
-            subject = f"{resource.title()} {action.title()}: {name}"
-            details = "\n".join([f"{k.replace('_', ' ').title()}: {v}" for k, v in data.items()])
-            message = f"{resource.upper()} {action.upper()}\n\n{details}"
-            
-            from ..sqs.interfaces import NotificationPayload
-            payload = NotificationPayload(
-                recipient_email="all_subscribers", 
-                subject=subject,
-                message=message,
-                notification_type="broadcast"
-            )
-            self.queue.queue_notification(payload, priority=priority)
-            print(f"Notification queued: {subject}")
-            return True
-        except Exception as e:
-            # log failure and return False so callers can continue
-            print(f"Failed to queue notification: {e}")
-            return False
+    def notify(self, action: str, resource: str, data: Dict[str, Any], priority="normal", actor: Dict[str, Any] = None):
+        # record the event in the outbox and return immediately; returns False if the outbox is full.
+        # `actor` (the current user) is resolved to "<action>_by" fields later, off the request path
+        accepted = self.outbox.put({
+            "action": action, "resource": resource, "data": data, "priority": priority, "actor": actor
+        })
+        if not accepted:
+            print(f"Notification outbox full, dropped: {resource} {action}")
+        return accepted
+
+    def _enqueue(self, event: Dict[str, Any], done: Callable[[bool], None]):
+        # runs on the outbox thread: format a human-readable notification and hand it to the queue;
+        # `done` reports whether SQS (or the SNS fallback) took it, so the outbox acks only then
+        action, resource, data = event["action"], event["resource"], event["data"]
+        actor = event.get("actor")
+        if actor is not None:
+            data = {
+                **data,
+                f"{action}_by": actor.get("email", "Unknown"),
+                f"{action}_by_name": actor.get("name", "Unknown User")
+            }
+        name = data.get('name', data.get('id', 'Item'))
+        subject = f"{resource.title()} {action.title()}: {name}"
+        details = "\n".join([f"{k.replace('_', ' ').title()}: {v}" for k, v in data.items()])
+        message = f"{resource.upper()} {action.upper()}\n\n{details}"
+
+        from ..sqs.interfaces import NotificationPayload
+        payload = NotificationPayload(
+            recipient_email="all_subscribers",
+            subject=subject,
+            message=message,
+            notification_type="broadcast"
+        )
+
+        def queued(delivered: bool):
+            if delivered:
+                print(f"Notification queued: {subject}")
+            done(delivered)
+
+        self.queue.queue_notification(payload, priority=event.get("priority", "normal"), on_done=queued)
+
+    def close(self):
+        # drain the outbox, then flush notifications still buffered for SQS
+        self.outbox.close()
+        self.queue.close()
 
 
 _service = None
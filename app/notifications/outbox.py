@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import uuid
+import glob
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from ..metrics import registry
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# In-process outbox: request handlers append events, a background thread hands them to the queue
+
+OUTBOX_ENQUEUED = registry.counter("notification_outbox_enqueued_total", "Events accepted into the notification outbox")
+OUTBOX_DELIVERED = registry.counter("notification_outbox_delivered_total", "Events handed off from the outbox to the queue")
+OUTBOX_DROPPED = registry.counter("notification_outbox_dropped_total", "Events dropped by the outbox, by reason")
+OUTBOX_LAG = registry.histogram(
+    "notification_outbox_lag_seconds", "Time from outbox append to hand-off",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0)
+)
+
+
+class OutboxJournal:
+    # append-only JSON-lines spill file so buffered events survive a crash.
+    # each process owns one locked file; files left unlocked by dead processes are replayed
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.path = os.path.join(directory, f"outbox-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+        self._file = open(self.path, 'a', encoding='utf-8')
+        if fcntl:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def recover(self) -> List[Dict[str, Any]]:
+        # collect unacknowledged events from journals no live process holds, then remove those files
+        events = []
+        for path in sorted(glob.glob(os.path.join(self.directory, 'outbox-*.jsonl'))):
+            if path == self.path:
+                continue
+            try:
+                with open(path, 'r+', encoding='utf-8') as f:
+                    if fcntl:
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    pending = {}
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # torn final line from the crash
+                        if 'ack' in record:
+                            pending.pop(record['ack'], None)
+                        else:
+                            pending[record['seq']] = record['event']
+                    events.extend(pending.values())
+                os.remove(path)
+            except (BlockingIOError, PermissionError):
+                continue  # still owned by a running worker
+            except Exception as e:
+                print(f"Failed to recover outbox journal {path}: {e}")
+        return events
+
+    def append(self, seq: int, event: Dict[str, Any]):
+        # flushed to the OS on every write: survives a process crash, not a host crash
+        self._file.write(json.dumps({'seq': seq, 'event': event}, default=str) + '\n')
+        self._file.flush()
+
+    def ack(self, seq: int):
+        self._file.write(json.dumps({'ack': seq}) + '\n')
+        self._file.flush()
+
+    def reset(self):
+        # nothing pending: start the file over so it doesn't grow without bound
+        self._file.seek(0)
+        self._file.truncate()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self, remove: bool = False):
+        self._file.close()
+        if remove:
+            os.remove(self.path)
+
+
+class NotificationOutbox:
+    # bounded buffer between request handlers (put is O(1)) and a delivery function run on a background thread.
+    # deliver(event, done) may finish asynchronously; it must call done(delivered) exactly once, and only
+    # then is the event acked in the journal or retried
+    def __init__(self, deliver: Callable[[Dict[str, Any], Callable[[bool], None]], None], maxsize: int = None,
+                 spill_dir: Optional[str] = None, max_attempts: int = None):
+        self.deliver = deliver
+        self.maxsize = maxsize or int(os.getenv('NOTIFY_OUTBOX_MAX_SIZE', '10000'))
+        self.max_attempts = max_attempts or int(os.getenv('NOTIFY_OUTBOX_MAX_ATTEMPTS', '5'))
+        spill_dir = spill_dir or os.getenv('NOTIFY_OUTBOX_SPILL_DIR')
+
+        # (seq, event, appended_at, attempt)
+        self._events = deque()
+        # seqs handed to deliver() whose done() hasn't been called yet
+        self._in_flight = set()
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+        self.journal = OutboxJournal(spill_dir) if spill_dir else None
+        if self.journal:
+            recovered = self.journal.recover()
+            for event in recovered:
+                self.put(event)
+            if recovered:
+                print(f"Recovered {len(recovered)} notification(s) from the outbox spill files")
+
+        registry.gauge("notification_outbox_depth", "Events waiting in the notification outbox", lambda: len(self._events))
+        registry.gauge("notification_outbox_capacity", "Maximum events the notification outbox holds", lambda: self.maxsize)
+
+    def put(self, event: Dict[str, Any]) -> bool:
+        # append an event; False when the outbox is full (backpressure) or closed
+        with self._cond:
+            if self._closed:
+                OUTBOX_DROPPED.inc(labels={"reason": "closed"})
+                return False
+            if len(self._events) >= self.maxsize:
+                OUTBOX_DROPPED.inc(labels={"reason": "full"})
+                return False
+            self._seq += 1
+            if self.journal:
+                self.journal.append(self._seq, event)
+            self._events.append((self._seq, event, time.monotonic(), 1))
+            OUTBOX_ENQUEUED.inc()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return True
+
+    def _run(self):
+        # after close, keep going until in-flight deliveries have finished (they may come back as retries)
+        while True:
+            with self._cond:
+                while not self._events and not (self._closed and not self._in_flight):
+                    self._cond.wait()
+                if not self._events:
+                    return
+                seq, event, appended_at, attempt = self._events.popleft()
+                self._in_flight.add(seq)
+            if attempt > 1:
+                time.sleep(min(0.5 * 2 ** (attempt - 2), 30))
+            self._deliver(seq, event, appended_at, attempt)
+
+    def _deliver(self, seq: int, event: Dict[str, Any], appended_at: float, attempt: int):
+        finished = []
+
+        def done(delivered: bool):
+            if not finished:
+                finished.append(True)
+                self._finish(seq, event, appended_at, attempt, delivered)
+
+        try:
+            self.deliver(event, done)
+        except Exception as e:
+            print(f"Outbox delivery raised: {e}")
+            done(False)
+
+    def _finish(self, seq: int, event: Dict[str, Any], appended_at: float, attempt: int, delivered: bool):
+        # may run on another thread (e.g. the SQS batch flusher)
+        with self._cond:
+            self._in_flight.discard(seq)
+            if delivered:
+                OUTBOX_DELIVERED.inc()
+                OUTBOX_LAG.observe(time.monotonic() - appended_at)
+            elif attempt < self.max_attempts:
+                # keep ordering: retry this event before anything newer
+                self._events.appendleft((seq, event, appended_at, attempt + 1))
+            else:
+                OUTBOX_DROPPED.inc(labels={"reason": "undeliverable"})
+                print(f"Dropping notification after {attempt} attempts: {event.get('action')} {event.get('resource')}")
+
+            if self.journal and not self.journal.closed and (delivered or attempt >= self.max_attempts):
+                if self._events or self._in_flight:
+                    self.journal.ack(seq)
+                else:
+                    self.journal.reset()
+            self._cond.notify_all()
+
+    def close(self, timeout: float = 10):
+        # stop accepting events and give the drain thread `timeout` seconds to finish, including
+        # deliveries still waiting on SQS; with a spill dir, anything left stays in the journal for the next process
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                return  # still delivering; leave the journal open for it
+        with self._cond:
+            if self.journal:
+                self.journal.close(remove=not self._events and not self._in_flight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": len(self._events),
+            "in_flight": len(self._in_flight),
+            "capacity": self.maxsize,
+            "enqueued": OUTBOX_ENQUEUED.value(),
+            "delivered": OUTBOX_DELIVERED.value(),
+            "spill_file": self.journal.path if self.journal else None
+        }
@@ -0,0 +1,125 @@
+import os
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any
+from pathlib import Path
+from dotenv import load_dotenv
+from ..aws_clients import get_client
+
+# Background SNS email subscription for newly registered users
+load_dotenv(dotenv_path=Path(__file__).resolve().parents[2] / ".env", override=True)
+
+
+class SubscriptionService:
+    # SubscriptionService: subscribes emails to the product topic off the request path, with retries
+    def __init__(self, max_attempts: int = None, base_delay: float = None):
+        self.max_attempts = max_attempts or int(os.getenv('SNS_SUBSCRIBE_MAX_ATTEMPTS', '5'))
+        self.base_delay = base_delay or float(os.getenv('SNS_SUBSCRIBE_RETRY_DELAY', '2'))
+        self.topic_name = os.getenv('AWS_SNS_TOPIC_NAME', 'product-notifications')
+
+        self._topic_arn = os.getenv('AWS_SNS_TOPIC_ARN')
+
+        # pending work is a heap of (due_time, seq, email, attempt) so retries can be delayed
+        self._pending = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+        self.failures = deque(maxlen=100)
+        self.stats = {
+            "queued": 0,
+            "subscribed": 0,
+            "retried": 0,
+            "failed": 0
+        }
+
+    def _get_sns_client(self):
+        # shared SNS client from the AWS client factory
+        return get_client('sns', os.getenv('AWS_SNS_REGION', 'us-east-1'))
+
+    def _get_topic_arn(self) -> str:
+        # resolve the topic ARN once; create_topic is idempotent and returns the existing ARN
+        if self._topic_arn is None:
+            response = self._get_sns_client().create_topic(Name=self.topic_name)
+            self._topic_arn = response['TopicArn']
+        return self._topic_arn
+
+    def subscribe(self, email: str):
+        # queue an email subscription and return immediately
+        with self._cond:
+            heapq.heappush(self._pending, (time.monotonic(), next(self._seq), email, 1))
+            self.stats["queued"] += 1
+            self._ensure_thread()
+            self._cond.notify()
+
+    def _ensure_thread(self):
+        # lazily start the daemon thread that performs subscriptions
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="sns-subscriber", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        # drain pending subscriptions, waiting for delayed retries to come due
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                due, _, email, attempt = self._pending[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(timeout=wait)
+                    continue
+                heapq.heappop(self._pending)
+
+            self._attempt(email, attempt)
+
+    def _attempt(self, email: str, attempt: int):
+        # try one subscription; on failure record it and schedule a retry with exponential backoff
+        try:
+            self._get_sns_client().subscribe(
+                TopicArn=self._get_topic_arn(),
+                Protocol='email',
+                Endpoint=email
+            )
+            self.stats["subscribed"] += 1
+        except Exception as e:
+            print(f"SNS subscription failed for {email} (attempt {attempt}): {e}")
+            self.failures.append({
+                "email": email,
+                "attempt": attempt,
+                "error": str(e),
+                "failed_at": datetime.now().isoformat()
+            })
+
+            if attempt < self.max_attempts:
+                delay = self.base_delay * (2 ** (attempt - 1))
+                with self._cond:
+                    heapq.heappush(self._pending, (time.monotonic() + delay, next(self._seq), email, attempt + 1))
+                    self._cond.notify()
+                self.stats["retried"] += 1
+            else:
+                self.stats["failed"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        # return counters, pending count and the most recent failures
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            **self.stats,
+            "pending": pending,
+            "recent_failures": list(self.failures)
+        }
+
+
+_service = None
+
+def get_subscription_service():
+    # return shared SubscriptionService instance
+    global _service
+    if not _service:
+        _service = SubscriptionService()
+    return _service
@@ -4,12 +4,13 @@ from fastapi import APIRouter, Depends
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field, HttpUrl
 from .utils import ok, bad
+from .threadpool import ThreadpoolTimedRoute
 from .auth import get_current_user
 from .dynamodb_client import get_db_client
 from .notifications import get_notification_service
 
 # products API endpoints (CRUD for products)
-router = APIRouter(prefix="/products", tags=["Products"])
+router = APIRouter(prefix="/products", tags=["Products"], route_class=ThreadpoolTimedRoute)
 
 try:
     db = get_db_client()
@@ -83,22 +84,16 @@ def create_product(body: ProductCreate, current=Depends(get_current_user)):
         product = db.create_product(product_data)
         
         try:
-            notification_data = {
-                **product,
-                "created_by": current.get("email", "Unknown"),
-                "created_by_name": current.get("name", "Unknown User")
-            }
-            
+            # only appends to the notification outbox; the creator's profile is looked up there too
             result = notification.notify(
                 action="created",
                 resource="product",
-                data=notification_data,
-                priority="normal"
+                data=product,
+                priority="normal",
+                actor=current
             )
             
-            if result:
-                print(f"Notification queued to SQS: {product.get('name')}")
-            else:
+            if not result:
                 print(f"Notification queueing failed: {product.get('name')}")
                 
         except Exception as notification_error:
@@ -169,16 +164,12 @@ def delete_product_by_id(product_id: str, current=Depends(get_current_user)):
             return bad(404, "NOT_FOUND", "Product not found")
         
         try:
-            notification_data = {
-                **existing_product,
-                "deleted_by": current.get("email", "Unknown"),
-                "deleted_by_name": current.get("name", "Unknown User")
-            }
             notification.notify(
                 action="deleted",
                 resource="product",
-                data=notification_data,
-                priority="high"  # High priority for deletions
+                data=existing_product,
+                priority="high",  # High priority for deletions
+                actor=current
             )
         except Exception:
             pass
@@ -0,0 +1,156 @@
+import os
+import math
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from .utils import bad
+from .cache import TTLCache
+from .cognito_client import get_cognito_client
+
+# Admission control: per-principal token buckets plus a global in-flight cap
+
+DEFAULT_ROUTE_COSTS = {
+    "GET /api/products/search": 10,
+    "POST /api/s3/upload": 5,
+}
+EXEMPT_PATHS = {"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"}
+
+
+def _parse_route_costs(value: str) -> Dict[str, float]:
+    # parse "GET /api/products/search=10,/api/s3/upload=5" into a cost table
+    costs = {}
+    for entry in value.split(','):
+        if '=' not in entry:
+            continue
+        route, cost = entry.rsplit('=', 1)
+        costs[route.strip()] = float(cost)
+    return costs
+
+
+class TokenBucketLimiter:
+    # token buckets keyed by principal; O(1) state each, least recently seen evicted first
+    def __init__(self, rate: float, burst: float, max_principals: int = 100000):
+        self.rate = rate
+        self.burst = burst
+        self.max_principals = max_principals
+        self._buckets = OrderedDict()
+
+    def acquire(self, key: str, cost: float = 1) -> Tuple[bool, float]:
+        # take `cost` tokens; returns (allowed, seconds until enough tokens are available)
+        now = time.monotonic()
+        cost = min(cost, self.burst)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self.burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_principals:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return True, 0.0
+        return False, (cost - bucket[0]) / self.rate
+
+
+class AdmissionControlMiddleware:
+    # ASGI middleware that sheds load with 429/503 before requests reach the threadpool
+    def __init__(self, app, rate: float = None, burst: float = None, max_in_flight: int = None,
+                 route_costs: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.enabled = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+        self.limiter = TokenBucketLimiter(
+            rate=rate or float(os.getenv('RATE_LIMIT_RATE', '10')),
+            burst=burst or float(os.getenv('RATE_LIMIT_BURST', '40')),
+            max_principals=int(os.getenv('RATE_LIMIT_MAX_PRINCIPALS', '100000'))
+        )
+        self.max_in_flight = max_in_flight or int(os.getenv('MAX_IN_FLIGHT_REQUESTS', '200'))
+        self.route_costs = dict(DEFAULT_ROUTE_COSTS)
+        self.route_costs.update(route_costs or _parse_route_costs(os.getenv('RATE_LIMIT_ROUTE_COSTS', '')))
+        # proxies in front of the app that append to X-Forwarded-For (1 for the load balancer);
+        # 0 ignores the header and keys on the socket peer
+        self.trusted_proxy_hops = int(os.getenv('RATE_LIMIT_TRUSTED_PROXY_HOPS', '1'))
+        # token -> verified subject ('' for tokens that failed verification)
+        self._subjects = TTLCache(maxsize=int(os.getenv('RATE_LIMIT_TOKEN_CACHE_SIZE', '10000')), ttl=300)
+        self.in_flight = 0
+        self.stats = {"admitted": 0, "rate_limited": 0, "shed": 0}
+
+    def _route_cost(self, method: str, path: str) -> float:
+        # method-specific cost wins over a path-only entry; everything else costs 1
+        return self.route_costs.get(f"{method} {path}", self.route_costs.get(path, 1))
+
+    def _client_ip(self, scope) -> str:
+        # the X-Forwarded-For entry added by the outermost trusted proxy, else the socket peer.
+        # entries left of it come from the client and can be forged
+        if self.trusted_proxy_hops > 0:
+            hops = [hop.strip() for name, value in scope.get('headers', []) if name == b'x-forwarded-for'
+                    for hop in value.decode('latin-1').split(',') if hop.strip()]
+            if hops:
+                return hops[-min(self.trusted_proxy_hops, len(hops))]
+        client = scope.get('client')
+        return client[0] if client else 'unknown'
+
+    async def _verified_subject(self, token: str) -> Optional[str]:
+        # subject of a token whose signature verifies, cached per token; verification runs off the
+        # event loop since the first call fetches the JWKS
+        subject = self._subjects.get(token)
+        if subject is None:
+            result = await asyncio.to_thread(get_cognito_client().verify_token, token)
+            subject = (result['user'].get('sub') or '') if result['valid'] else ''
+            ttl = 300
+            if subject and result['user'].get('exp'):
+                ttl = max(min(ttl, result['user']['exp'] - time.time()), 0)
+            self._subjects.set(token, subject, ttl=ttl)
+        return subject or None
+
+    async def _principal(self, scope, path: str) -> str:
+        # key by verified token subject; auth routes (no token yet) and forged or expired tokens fall back to IP
+        if not path.startswith('/api/auth/'):
+            for name, value in scope.get('headers', []):
+                if name == b'authorization':
+                    scheme, _, token = value.decode('latin-1').partition(' ')
+                    if scheme.lower() == 'bearer' and token:
+                        subject = await self._verified_subject(token)
+                        if subject:
+                            return f"sub:{subject}"
+                    break
+        return f"ip:{self._client_ip(scope)}"
+
+    def _reject(self, status_code: int, code: str, message: str, retry_after: float):
+        response = bad(status_code, code, message)
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.enabled or scope['path'] in EXEMPT_PATHS \
+                or scope['method'] == 'OPTIONS':
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight >= self.max_in_flight:
+            self.stats["shed"] += 1
+            response = self._reject(503, "OVERLOADED", "Server is busy, retry shortly", 1)
+            await response(scope, receive, send)
+            return
+
+        path = scope['path']
+        allowed, retry_after = self.limiter.acquire(
+            await self._principal(scope, path),
+            self._route_cost(scope['method'], path)
+        )
+        if not allowed:
+            self.stats["rate_limited"] += 1
+            response = self._reject(429, "RATE_LIMITED", "Too many requests", retry_after)
+            await response(scope, receive, send)
+            return
+
+        self.stats["admitted"] += 1
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
@@ -1,5 +1,20 @@
 """S3 utilities exported for file operations and bulk uploads."""
 from .s3_client import S3Client
 from .service import BulkDataService
+from .importer import ProductImportService, get_import_service
+from .async_client import S3Executor, get_s3_executor
+from .manifest import FileManifest, get_file_manifest
+from .snapshot import CatalogSnapshotService, get_snapshot_service
 
-__all__ = ['S3Client', 'BulkDataService']
\ No newline at end of file
+__all__ = [
+    'S3Client',
+    'BulkDataService',
+    'ProductImportService',
+    'get_import_service',
+    'S3Executor',
+    'get_s3_executor',
+    'FileManifest',
+    'get_file_manifest',
+    'CatalogSnapshotService',
+    'get_snapshot_service'
+]
\ No newline at end of file
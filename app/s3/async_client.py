@@ -0,0 +1,48 @@
+import os
+import time
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from ..metrics import registry
+
+# Async access to the (blocking) boto3 S3 calls via a dedicated, bounded thread pool
+
+S3_CALL_SECONDS = registry.histogram("s3_call_seconds", "Wall time of S3 calls made through the S3 executor")
+S3_CALL_ERRORS = registry.counter("s3_call_errors_total", "S3 executor calls that raised")
+S3_IN_FLIGHT = registry.gauge("s3_executor_in_flight", "S3 calls submitted to the executor and not yet finished")
+
+
+class S3Executor:
+    # keeps S3 round trips off the event loop without competing for the request threadpool
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or int(os.getenv('S3_EXECUTOR_WORKERS', '16'))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='s3')
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        # run a blocking S3 call in the pool and record its duration under the function name
+        operation = getattr(func, '__name__', 'call')
+        loop = asyncio.get_running_loop()
+        S3_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        except Exception:
+            S3_CALL_ERRORS.inc(labels={"operation": operation})
+            raise
+        finally:
+            S3_IN_FLIGHT.dec()
+            S3_CALL_SECONDS.observe(time.perf_counter() - start, {"operation": operation})
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+_executor = None
+
+def get_s3_executor():
+    # return shared S3Executor instance
+    global _executor
+    if not _executor:
+        _executor = S3Executor()
+    return _executor
@@ -0,0 +1,317 @@
+import os
+import io
+import csv
+import json
+import uuid
+import itertools
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter, ValidationError
+from .s3_client import S3Client
+from .xlsx_reader import open_xlsx, iter_xlsx_dict_rows
+
+# Bulk product import: streams a stored CSV/JSON/XLSX file from S3 into the products table
+
+SUPPORTED_IMPORT_TYPES = ('csv', 'json', 'xlsx')
+
+
+class _RawStream(io.RawIOBase):
+    # adapt a botocore StreamingBody to RawIOBase so it can sit under TextIOWrapper
+    def __init__(self, body):
+        self._body = body
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._body.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._body.close()
+        super().close()
+
+
+def open_text_stream(body) -> io.TextIOWrapper:
+    # decode an S3 object body incrementally (UTF-8, BOM tolerated)
+    return io.TextIOWrapper(io.BufferedReader(_RawStream(body), buffer_size=256 * 1024),
+                            encoding='utf-8-sig', newline='')
+
+
+def iter_csv_rows(text: io.TextIOBase) -> Iterator[Dict[str, Any]]:
+    # yield one dict per CSV data row, keyed by the header row
+    for row in csv.DictReader(text):
+        yield row
+
+
+def iter_json_rows(text: io.TextIOBase, chunk_size: int = 64 * 1024,
+                   max_object_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    # yield objects from either a top-level JSON array or newline-delimited JSON, without loading the file.
+    # an array element that is still incomplete after max_object_size characters (usually malformed
+    # input) raises instead of pulling the rest of the file into the buffer
+    max_object_size = max_object_size or int(os.getenv('IMPORT_JSON_MAX_OBJECT_SIZE', str(16 * 1024 * 1024)))
+    decoder = json.JSONDecoder()
+    # skip leading whitespace, however long, before deciding which format this is
+    head = ''
+    while not head:
+        chunk = text.read(chunk_size)
+        if not chunk:
+            return
+        head = chunk.lstrip()
+    if not head.startswith('['):
+        # NDJSON: finish the partially read line, then continue line by line
+        for line in itertools.chain(io.StringIO(head + text.readline()), text):
+            if line.strip():
+                yield json.loads(line)
+        return
+
+    buffer = head[1:]
+    # parse position within buffer; consumed text is only dropped when more input is read
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if buffer.startswith(']', pos):
+            return
+        try:
+            if pos == len(buffer):
+                raise json.JSONDecodeError("Expecting value", buffer, pos)
+            obj, end = decoder.raw_decode(buffer, pos)
+            if end == len(buffer) and not eof:
+                # a number or literal ending the buffer may continue in the next chunk
+                raise json.JSONDecodeError("Element may continue", buffer, end)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            pending = len(buffer) - pos
+            if pending > max_object_size:
+                raise ValueError(f"JSON array element exceeds {max_object_size} characters (malformed input?)")
+            # read at least as much as is pending so a large element isn't re-parsed once per small chunk
+            chunk = text.read(max(chunk_size, pending))
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield obj
+        pos = end
+
+
+class ImportJob:
+    # progress and per-row errors for one import run
+    def __init__(self, file_key: str, started_by: Optional[str] = None, max_errors: int = 1000,
+                 sha256: Optional[str] = None):
+        self.job_id = str(uuid.uuid4())
+        self.file_key = file_key
+        self.sha256 = sha256
+        self.started_by = started_by
+        self.status = "queued"
+        self.rows_read = 0
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.errors = deque(maxlen=max_errors)
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def add_errors(self, errors: List[Dict[str, Any]], rows: Optional[int] = None):
+        # `rows` is the number of rows the errors cover when it isn't one error per row
+        with self._lock:
+            self.rows_failed += len(errors) if rows is None else rows
+            self.errors.extend(errors)
+
+    def add_written(self, count: int):
+        with self._lock:
+            self.rows_written += count
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "file_key": self.file_key,
+                "sha256": self.sha256,
+                "started_by": self.started_by,
+                "status": self.status,
+                "rows_read": self.rows_read,
+                "rows_written": self.rows_written,
+                "rows_failed": self.rows_failed,
+                "errors": list(self.errors),
+                "error": self.error,
+                "created_at": self.created_at.isoformat(),
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None
+            }
+
+
+class ProductImportService:
+    # runs import jobs in background threads with bounded batch-write concurrency
+    def __init__(self, s3_client: Optional[S3Client] = None, file_service=None):
+        self.s3_client = s3_client or S3Client()
+        # BulkDataService, when available, supplies content digests so identical files import once
+        self.file_service = file_service
+        self.batch_size = int(os.getenv('IMPORT_BATCH_SIZE', '500'))
+        self.write_concurrency = int(os.getenv('IMPORT_WRITE_CONCURRENCY', '4'))
+        self.max_errors = int(os.getenv('IMPORT_MAX_ERRORS', '1000'))
+        self.max_jobs = int(os.getenv('IMPORT_MAX_JOBS', '100'))
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._adapter = None
+
+    def _get_adapter(self) -> TypeAdapter:
+        # imported lazily so the S3 package does not pull in the products router at import time
+        if self._adapter is None:
+            from ..products import ProductCreate
+            self._adapter = TypeAdapter(List[ProductCreate])
+        return self._adapter
+
+    def start_import(self, file_key: str, started_by: Optional[str] = None, force: bool = False) -> Dict[str, Any]:
+        # register a job and run it on a background thread; content that was already imported is skipped
+        extension = file_key.rsplit('.', 1)[-1].lower()
+        if extension not in SUPPORTED_IMPORT_TYPES:
+            return {
+                'success': False,
+                'error': f'Import not supported for .{extension} files. Supported: {", ".join(SUPPORTED_IMPORT_TYPES)}'
+            }
+
+        sha256 = None
+        if self.file_service:
+            sha256 = (self.file_service.get_file_info(file_key) or {}).get('sha256')
+            entry = self.file_service.find_by_digest(sha256) if sha256 else None
+            if entry and entry.get('imported_by_job') and not force:
+                return {
+                    'success': False,
+                    'duplicate': True,
+                    'error': f"File content already imported by job {entry['imported_by_job']}",
+                    'imported_by_job': entry['imported_by_job']
+                }
+
+        job = ImportJob(file_key, started_by, self.max_errors, sha256)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+        threading.Thread(target=self._run, args=(job,), name=f"import-{job.job_id[:8]}", daemon=True).start()
+        return {'success': True, 'job': job.to_dict()}
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    def _iter_rows(self, file_key: str) -> Iterator[Dict[str, Any]]:
+        # pick a row parser based on the file extension
+        if file_key.lower().endswith('.xlsx'):
+            yield from iter_xlsx_dict_rows(open_xlsx(self.s3_client, file_key))
+            return
+
+        body = self.s3_client.open_stream(file_key)
+        if body is None:
+            raise FileNotFoundError(f"File not found: {file_key}")
+
+        text = open_text_stream(body)
+        try:
+            if file_key.lower().endswith('.json'):
+                yield from iter_json_rows(text)
+            else:
+                yield from iter_csv_rows(text)
+        finally:
+            text.close()
+
+    def _clean_row(self, row: Any) -> Any:
+        # blank CSV cells mean "not provided" rather than an empty string
+        if isinstance(row, dict):
+            return {k: (None if v == '' else v) for k, v in row.items() if k}
+        return row
+
+    def _validate_batch(self, job: ImportJob, rows: List[Any], first_row: int) -> List[Dict[str, Any]]:
+        # validate a whole batch in one call; on failure drop the offending rows and revalidate the rest
+        adapter = self._get_adapter()
+        try:
+            models = adapter.validate_python(rows)
+        except ValidationError as e:
+            failed = {}
+            for error in e.errors():
+                index = error['loc'][0]
+                field = ".".join(str(part) for part in error['loc'][1:]) or None
+                failed.setdefault(index, []).append({"field": field, "message": error['msg']})
+            job.add_errors([
+                {"row": first_row + index, "errors": errors} for index, errors in sorted(failed.items())
+            ])
+            rows = [row for index, row in enumerate(rows) if index not in failed]
+            models = adapter.validate_python(rows) if rows else []
+
+        return [jsonable_encoder(model.model_dump(mode="json")) for model in models]
+
+    def _write_batch(self, job: ImportJob, products: List[Dict[str, Any]], first_row: int):
+        # runs on the writer pool; a failed batch marks all its rows as failed rather than the whole job
+        from ..dynamodb_client import get_db_client
+        try:
+            job.add_written(get_db_client().batch_create_products(products))
+        except Exception as e:
+            job.add_errors([{"row": first_row, "errors": [{"field": None, "message": f"Batch write failed ({len(products)} rows): {e}"}]}],
+                           rows=len(products))
+
+    def _run(self, job: ImportJob):
+        # stream rows -> validate in batches -> write with at most write_concurrency batches in flight
+        job.status = "running"
+        in_flight = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=self.write_concurrency) as writers:
+                batch = []
+                first_row = 1
+                for row in self._iter_rows(job.file_key):
+                    batch.append(self._clean_row(row))
+                    job.rows_read += 1
+                    if len(batch) >= self.batch_size:
+                        self._submit(writers, in_flight, job, batch, first_row)
+                        first_row += len(batch)
+                        batch = []
+                if batch:
+                    self._submit(writers, in_flight, job, batch, first_row)
+                for future in in_flight:
+                    future.result()
+            job.status = "completed"
+            self._mark_imported(job)
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+
+    def _mark_imported(self, job: ImportJob):
+        # remember in the digest index that this content has been imported; a job with failed rows
+        # isn't recorded, so the file can be imported again after fixing it or the write errors
+        if not (self.file_service and job.sha256 and job.rows_written) or job.rows_failed:
+            return
+        try:
+            self.file_service.update_digest_entry(job.sha256, imported_by_job=job.job_id,
+                                                  imported_at=datetime.now(timezone.utc).isoformat())
+        except Exception as e:
+            print(f"Failed to mark {job.file_key} as imported: {e}")
+
+    def _submit(self, writers: ThreadPoolExecutor, in_flight: deque, job: ImportJob, batch: List[Any], first_row: int):
+        # validate on the reader thread, then hand the write to the pool once a slot is free
+        products = self._validate_batch(job, batch, first_row)
+        if not products:
+            return
+        while len(in_flight) >= self.write_concurrency:
+            in_flight.popleft().result()
+        in_flight.append(writers.submit(self._write_batch, job, products, first_row))
+
+
+_service = None
+
+def get_import_service(file_service=None):
+    # return shared ProductImportService instance
+    global _service
+    if not _service:
+        _service = ProductImportService(
+            s3_client=file_service.s3_client if file_service else None,
+            file_service=file_service
+        )
+    return _service
@@ -0,0 +1,131 @@
+import os
+import json
+import base64
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from boto3.dynamodb.conditions import Key, Attr
+from ..aws_clients import get_resource
+
+# Manifest of uploaded files in DynamoDB, so listings and filters don't walk the bucket
+
+UPLOADER_INDEX = 'uploaded_by-index'
+MONTH_INDEX = 'upload_month-index'
+
+
+def encode_cursor(last_key: Optional[Dict]) -> Optional[str]:
+    # opaque pagination cursor from a DynamoDB LastEvaluatedKey
+    if not last_key:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(last_key, default=str).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict]:
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class FileManifest:
+    # one item per stored file, keyed by file_key, with GSIs by uploader and by upload month
+    def __init__(self, table_name: str):
+        self.dynamodb = get_resource('dynamodb', os.getenv('AWS_REGION', 'us-east-1'))
+        self.table = self.dynamodb.Table(table_name)
+        # upper bound on DynamoDB round trips per listing page when filters discard most items
+        self.max_round_trips = int(os.getenv('S3_MANIFEST_MAX_ROUND_TRIPS', '10'))
+
+    def _to_item(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: (Decimal(str(v)) if isinstance(v, float) else v) for k, v in fields.items() if v is not None}
+
+    def _from_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: (int(v) if isinstance(v, Decimal) and v % 1 == 0 else float(v) if isinstance(v, Decimal) else v)
+                for k, v in item.items()}
+
+    def put(self, file_key: str, **fields) -> Dict[str, Any]:
+        # write the entry for a newly stored file; upload_month feeds the date index
+        entry = {'file_key': file_key, **fields}
+        if entry.get('uploaded_at'):
+            entry['upload_month'] = entry['uploaded_at'][:7]
+        if 'file_type' not in entry:
+            entry['file_type'] = file_key.rsplit('.', 1)[-1].lower()
+        self.table.put_item(Item=self._to_item(entry))
+        return entry
+
+    def update(self, file_key: str, **fields):
+        # set fields on an existing entry (e.g. row count and digest from a background scan)
+        fields = self._to_item(fields)
+        if not fields:
+            return
+        self.table.update_item(
+            Key={'file_key': file_key},
+            UpdateExpression="SET " + ", ".join(f"#{k} = :{k}" for k in fields),
+            ExpressionAttributeNames={f"#{k}": k for k in fields},
+            ExpressionAttributeValues={f":{k}": v for k, v in fields.items()}
+        )
+
+    def delete(self, file_key: str):
+        self.table.delete_item(Key={'file_key': file_key})
+
+    def query(self, prefix: str = '', date: Optional[str] = None, uploaded_by: Optional[str] = None,
+              file_type: Optional[str] = None, min_size: Optional[int] = None, max_size: Optional[int] = None,
+              cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        # one page of entries; uploader/day/month filters use an index (newest first), anything else filters a scan
+        params: Dict[str, Any] = {}
+        filters = []
+        if uploaded_by:
+            condition = Key('uploaded_by').eq(uploaded_by)
+            if date:
+                condition = condition & Key('uploaded_at').begins_with(date)
+            params.update(IndexName=UPLOADER_INDEX, KeyConditionExpression=condition, ScanIndexForward=False)
+        elif date and len(date) >= 7:
+            condition = Key('upload_month').eq(date[:7])
+            if len(date) > 7:
+                condition = condition & Key('uploaded_at').begins_with(date)
+            params.update(IndexName=MONTH_INDEX, KeyConditionExpression=condition, ScanIndexForward=False)
+        elif date:
+            filters.append(Attr('uploaded_at').begins_with(date))
+
+        if prefix:
+            filters.append(Attr('file_key').begins_with(prefix))
+        if file_type:
+            filters.append(Attr('file_type').eq(file_type.lower().lstrip('.')))
+        if min_size is not None:
+            filters.append(Attr('size_bytes').gte(min_size))
+        if max_size is not None:
+            filters.append(Attr('size_bytes').lte(max_size))
+        if filters:
+            expression = filters[0]
+            for condition in filters[1:]:
+                expression = expression & condition
+            params['FilterExpression'] = expression
+
+        operation = self.table.query if 'KeyConditionExpression' in params else self.table.scan
+        start_key = decode_cursor(cursor)
+        items: List[Dict[str, Any]] = []
+        # Limit counts evaluated items, so asking only for what is still missing keeps the cursor exact
+        for _ in range(self.max_round_trips):
+            if start_key:
+                params['ExclusiveStartKey'] = start_key
+            response = operation(Limit=limit - len(items), **params)
+            items.extend(self._from_item(item) for item in response.get('Items', []))
+            start_key = response.get('LastEvaluatedKey')
+            if not start_key or len(items) >= limit:
+                break
+
+        return {
+            'files': items,
+            'next_cursor': encode_cursor(self._from_item(start_key) if start_key else None)
+        }
+
+
+_manifest = None
+
+def get_file_manifest() -> Optional[FileManifest]:
+    # shared FileManifest, or None when AWS_DYNAMODB_MANIFEST_TABLE is not configured
+    global _manifest
+    table_name = os.getenv('AWS_DYNAMODB_MANIFEST_TABLE')
+    if not _manifest and table_name:
+        _manifest = FileManifest(table_name)
+    return _manifest
@@ -1,9 +1,9 @@
 import os
-import boto3
 from typing import List, Dict, Optional, BinaryIO
 from pathlib import Path
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
+from ..aws_clients import get_client
 
 
 # S3 helper client for simple upload/download/list operations
@@ -22,12 +22,7 @@ class S3Client:
         if not all([self.aws_access_key_id, self.aws_secret_access_key, self.bucket_name]):
             raise ValueError("Missing S3 configuration in environment variables")
         
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=self.aws_access_key_id,
-            aws_secret_access_key=self.aws_secret_access_key,
-            region_name=self.aws_region
-        )
+        self.s3_client = get_client('s3', self.aws_region)
         
 
     
@@ -47,6 +42,87 @@ class S3Client:
         except Exception as e:
             return False
     
+    def upload_fileobj(self, fileobj: BinaryIO, file_key: str, content_type: str = 'application/octet-stream') -> bool:
+        # upload a file-like object; boto3's transfer manager switches to concurrent multipart for large files
+        try:
+            self.s3_client.upload_fileobj(
+                fileobj,
+                self.bucket_name,
+                file_key,
+                ExtraArgs={'ContentType': content_type}
+            )
+            return True
+            
+        except ClientError as e:
+            return False
+        except Exception as e:
+            return False
+    
+    def create_multipart_upload(self, file_key: str, content_type: str = 'application/octet-stream') -> Optional[str]:
+        # start a multipart upload and return its upload id
+        try:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=file_key,
+                ContentType=content_type
+            )
+            return response['UploadId']
+            
+        except ClientError as e:
+            return None
+        except Exception as e:
+            return None
+    
+    def upload_part(self, file_key: str, upload_id: str, part_number: int, data: bytes) -> Optional[str]:
+        # upload one part of a multipart upload and return its ETag
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket_name,
+                Key=file_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=data
+            )
+            return response['ETag']
+            
+        except ClientError as e:
+            return None
+        except Exception as e:
+            return None
+    
+    def complete_multipart_upload(self, file_key: str, upload_id: str, etags: List[str]) -> bool:
+        # assemble uploaded parts (in part-number order) into the final object
+        try:
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=file_key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    'Parts': [{'ETag': etag, 'PartNumber': i} for i, etag in enumerate(etags, start=1)]
+                }
+            )
+            return True
+            
+        except ClientError as e:
+            return False
+        except Exception as e:
+            return False
+    
+    def abort_multipart_upload(self, file_key: str, upload_id: str) -> bool:
+        # abort a multipart upload so S3 discards the stored parts
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=file_key,
+                UploadId=upload_id
+            )
+            return True
+            
+        except ClientError as e:
+            return False
+        except Exception as e:
+            return False
+    
     def download_file(self, file_key: str) -> Optional[bytes]:
         # download an object from S3 and return its bytes
         try:
@@ -59,6 +135,37 @@ class S3Client:
         except Exception as e:
             return None
     
+    def get_range(self, file_key: str, start: int, end: int) -> Optional[Dict]:
+        # fetch bytes [start, end] of an object; also returns the full object size
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=file_key,
+                Range=f'bytes={start}-{end}'
+            )
+            content = response['Body'].read()
+            total_size = int(response.get('ContentRange', '').rsplit('/', 1)[-1] or len(content))
+            return {'content': content, 'total_size': total_size}
+            
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'InvalidRange':
+                # empty objects reject every range
+                return {'content': b'', 'total_size': 0}
+            return None
+        except Exception as e:
+            return None
+    
+    def open_stream(self, file_key: str):
+        # open an object for incremental reading; returns the botocore StreamingBody or None
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_key)
+            return response['Body']
+            
+        except ClientError as e:
+            return None
+        except Exception as e:
+            return None
+    
     def list_files(self, prefix: str = '') -> List[Dict]:
         # list objects under a prefix and return metadata list
         try:
@@ -84,6 +191,39 @@ class S3Client:
         except Exception as e:
             return []
     
+    def list_files_page(self, prefix: str = '', max_keys: int = 1000,
+                        continuation_token: Optional[str] = None, start_after: Optional[str] = None) -> Dict:
+        # list one page of objects under a prefix, optionally resuming after a key; next_token is None on the last page
+        try:
+            params = {
+                'Bucket': self.bucket_name,
+                'Prefix': prefix,
+                'MaxKeys': max_keys
+            }
+            if continuation_token:
+                params['ContinuationToken'] = continuation_token
+            if start_after:
+                params['StartAfter'] = start_after
+            
+            response = self.s3_client.list_objects_v2(**params)
+            
+            files = [{
+                'key': obj['Key'],
+                'size': obj['Size'],
+                'last_modified': obj['LastModified'].isoformat(),
+                'etag': obj['ETag'].strip('"')
+            } for obj in response.get('Contents', [])]
+            
+            return {
+                'files': files,
+                'next_token': response.get('NextContinuationToken') if response.get('IsTruncated') else None
+            }
+            
+        except ClientError as e:
+            return {'files': [], 'next_token': None}
+        except Exception as e:
+            return {'files': [], 'next_token': None}
+    
     def delete_file(self, file_key: str) -> bool:
         # delete an object by key
         try:
@@ -95,15 +235,17 @@ class S3Client:
         except Exception as e:
             return False
     
-    def file_exists(self, file_key: str) -> bool:
-        # check if an object exists in the bucket
+    def file_exists(self, file_key: str) -> Optional[bool]:
+        # check if an object exists in the bucket; None when S3 couldn't say (throttling, network errors)
         try:
             self.s3_client.head_object(Bucket=self.bucket_name, Key=file_key)
             return True
-        except ClientError:
-            return False
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            return None
         except Exception:
-            return False
+            return None
     
     def get_file_url(self, file_key: str, expiration: int = 3600) -> Optional[str]:
         # generate a presigned URL for a file
@@ -118,4 +260,48 @@ class S3Client:
         except ClientError as e:
             return None
         except Exception as e:
-            return None
\ No newline at end of file
+            return None
+    
+    def generate_upload_post(self, file_key: str, content_type: str, max_size: int,
+                             metadata: Optional[Dict[str, str]] = None, expiration: int = 900) -> Optional[Dict]:
+        # generate a presigned POST that only accepts this key, content type and size range
+        try:
+            fields = {'Content-Type': content_type}
+            conditions = [
+                {'Content-Type': content_type},
+                ['content-length-range', 1, max_size]
+            ]
+            for name, value in (metadata or {}).items():
+                fields[f'x-amz-meta-{name}'] = value
+                conditions.append({f'x-amz-meta-{name}': value})
+            
+            return self.s3_client.generate_presigned_post(
+                Bucket=self.bucket_name,
+                Key=file_key,
+                Fields=fields,
+                Conditions=conditions,
+                ExpiresIn=expiration
+            )
+            
+        except ClientError as e:
+            return None
+        except Exception as e:
+            return None
+    
+    def get_file_metadata(self, file_key: str) -> Optional[Dict]:
+        # return size, content type and user metadata for an object, or None if missing
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=file_key)
+            return {
+                'key': file_key,
+                'size': response['ContentLength'],
+                'content_type': response.get('ContentType'),
+                'last_modified': response['LastModified'].isoformat(),
+                'etag': response['ETag'].strip('"'),
+                'metadata': response.get('Metadata', {})
+            }
+            
+        except ClientError as e:
+            return None
+        except Exception as e:
+            return None
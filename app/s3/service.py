@@ -2,10 +2,98 @@ import os
 import csv
 import json
 import uuid
-from datetime import datetime
-from typing import List, Dict, Optional, Union
+import hashlib
+import asyncio
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Union, AsyncIterator
 from io import StringIO, BytesIO
+from ..cache import TTLCache
 from .s3_client import S3Client
+from .async_client import get_s3_executor
+from .xlsx_reader import open_xlsx
+from .manifest import get_file_manifest
+
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# uploads are partitioned by UTC day: uploads/YYYY/MM/DD/HHMMSS_<id>_<original name>
+UPLOAD_PREFIX = 'uploads/'
+MAX_LIST_PAGE_SIZE = 1000
+
+# small JSON sidecars (row counts, upload info) live under this prefix, keyed by the file key
+META_PREFIX = '_meta/'
+# content digest index: _digests/<sha256>.json points at the first stored copy of that content
+DIGEST_PREFIX = '_digests/'
+# catalog exports (see snapshot.py)
+SNAPSHOT_PREFIX = 'snapshots/'
+INTERNAL_PREFIXES = (META_PREFIX, DIGEST_PREFIX, SNAPSHOT_PREFIX)
+ROW_COUNTED_TYPES = ('csv', 'txt')
+# RowCounter's fast path strips a chunk down to its quotes and newlines
+NOT_QUOTE_OR_NEWLINE = bytes(byte for byte in range(256) if byte not in b'"\n')
+
+
+class RowCounter:
+    # counts CSV data rows (records after the header) as bytes stream past. a newline inside a
+    # quoted field doesn't end the record, and blank lines don't count, matching the importer's DictReader
+    def __init__(self):
+        self.records = 0
+        self.size = 0
+        self._in_quotes = False
+        self._has_content = False
+
+    def update(self, chunk: bytes):
+        if not chunk:
+            return
+        self.size += len(chunk)
+        # '"' and '\n' are single bytes in UTF-8, so the bytes can be scanned without decoding
+        start = 0
+        if self._in_quotes:
+            start = chunk.find(b'"') + 1
+            if not start:
+                return  # the whole chunk is inside a quoted field
+            self._in_quotes = False
+            self._has_content = True
+        if b'\n\n' in chunk or b'\n\r' in chunk or \
+                (not self._has_content and chunk.startswith((b'\n', b'\r'), start)):
+            # possibly blank lines, which don't count: take the exact path
+            self._scan(chunk[start:])
+            return
+        # no blank lines: every unquoted newline ends a record. between quotes only newlines are left,
+        # and the even pieces are the unquoted ones, so counting them needs no Python loop
+        pieces = (chunk[start:] if start else chunk).translate(None, NOT_QUOTE_OR_NEWLINE).split(b'"')
+        records = sum(map(len, pieces[::2]))
+        self._in_quotes = len(pieces) % 2 == 0
+        if records:
+            self.records += records
+            self._has_content = False
+        if self._in_quotes or chunk[chunk.rfind(b'\n') + 1:].strip(b'\r'):
+            self._has_content = True
+
+    def _scan(self, chunk: bytes):
+        for index, segment in enumerate(chunk.split(b'"')):
+            if index:
+                # every quote toggles quoting; an escaped "" toggles twice
+                self._in_quotes = not self._in_quotes
+                self._has_content = True
+            if not self._in_quotes:
+                self._count_lines(segment)
+
+    def _count_lines(self, segment: bytes):
+        lines = segment.split(b'\n')
+        for line in lines[:-1]:
+            if self._has_content or line.strip(b'\r'):
+                self.records += 1
+            self._has_content = False
+        if lines[-1].strip(b'\r'):
+            self._has_content = True
+
+    @property
+    def rows(self) -> int:
+        # a final record without a trailing newline still counts; the header does not
+        records = self.records + (1 if self._has_content else 0)
+        return max(records - 1, 0)
 
 
 class BulkDataService:
@@ -14,22 +102,63 @@ class BulkDataService:
     def __init__(self):
         # initialize S3 client and allowed file types
         self.s3_client = S3Client()
+        self.executor = get_s3_executor()
+        # DynamoDB manifest of uploads; when not configured, listings fall back to walking the bucket
+        self.manifest = get_file_manifest()
         self.allowed_file_types = {
             'csv': 'text/csv',
             'json': 'application/json',
             'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             'txt': 'text/plain'
         }
+        self.part_size = max(int(os.getenv('S3_UPLOAD_PART_SIZE', str(8 * 1024 * 1024))), MIN_PART_SIZE)
+        self.upload_concurrency = int(os.getenv('S3_UPLOAD_CONCURRENCY', '4'))
+        # presigned POST uploads are capped at 5 GB by S3
+        self.max_upload_size = int(os.getenv('S3_MAX_UPLOAD_SIZE', str(5 * 1024 ** 3)))
+        
+        # signed URLs are reused until they get within url_refresh_margin of expiring
+        self._url_cache = TTLCache(maxsize=int(os.getenv('S3_URL_CACHE_SIZE', '5000')))
+        self.url_refresh_margin = float(os.getenv('S3_URL_REFRESH_MARGIN', '0.2'))
+        self._exists_cache = TTLCache(
+            maxsize=int(os.getenv('S3_EXISTS_CACHE_SIZE', '5000')),
+            ttl=float(os.getenv('S3_EXISTS_CACHE_TTL', '30'))
+        )
+        
+        self.preview_range_bytes = int(os.getenv('S3_PREVIEW_RANGE_BYTES', str(64 * 1024)))
+        self.preview_max_bytes = int(os.getenv('S3_PREVIEW_MAX_BYTES', str(1024 * 1024)))
+        self._metadata_cache = TTLCache(maxsize=int(os.getenv('S3_URL_CACHE_SIZE', '5000')), ttl=3600)
+        self._digest_cache = TTLCache(maxsize=int(os.getenv('S3_URL_CACHE_SIZE', '5000')), ttl=3600)
+        self._counting = set()
+        self._counting_lock = threading.Lock()
         
     
     def generate_file_key(self, original_filename: str) -> str:
-        # generate a unique filename key for storage
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # generate a unique, date-partitioned key for storage
+        now = datetime.now(timezone.utc)
         unique_id = str(uuid.uuid4())[:8]
         
-        filename = f"{timestamp}_{unique_id}_{original_filename}"
+        filename = f"{UPLOAD_PREFIX}{now.strftime('%Y/%m/%d')}/{now.strftime('%H%M%S')}_{unique_id}_{original_filename}"
         return filename
     
+    def date_prefix(self, date: str) -> str:
+        # map 'YYYY', 'YYYY-MM' or 'YYYY-MM-DD' to its upload partition prefix
+        for fmt, layout in (('%Y-%m-%d', '%Y/%m/%d/'), ('%Y-%m', '%Y/%m/'), ('%Y', '%Y/')):
+            try:
+                return UPLOAD_PREFIX + datetime.strptime(date, fmt).strftime(layout)
+            except ValueError:
+                continue
+        raise ValueError(f"Invalid date '{date}', expected YYYY, YYYY-MM or YYYY-MM-DD")
+    
+    def original_filename(self, file_key: str) -> str:
+        # recover the client's filename from a generated key
+        if file_key.startswith(UPLOAD_PREFIX):
+            parts = file_key.rsplit('/', 1)[-1].split('_', 2)
+            return parts[2] if len(parts) == 3 else file_key
+        
+        # legacy flat keys: YYYYMMDD_HHMMSS_<id>_<name>
+        parts = file_key.split('_', 3)
+        return parts[3] if len(parts) == 4 else file_key
+    
     def validate_file_type(self, filename: str) -> bool:
         # check if the uploaded file has an allowed extension
         file_extension = filename.split('.')[-1].lower()
@@ -40,7 +169,7 @@ class BulkDataService:
         file_extension = filename.split('.')[-1].lower()
         return self.allowed_file_types.get(file_extension, 'application/octet-stream')
     
-    def upload_bulk_file(self, file_content: bytes, filename: str) -> Optional[Dict]:
+    def upload_bulk_file(self, file_content: bytes, filename: str, uploaded_by: Optional[str] = None) -> Optional[Dict]:
         # validate and upload a bulk file to S3
         try:
             if not self.validate_file_type(filename):
@@ -49,19 +178,29 @@ class BulkDataService:
                     'error': f'File type not allowed. Supported: {", ".join(self.allowed_file_types.keys())}'
                 }
             
+            sha256 = hashlib.sha256(file_content).hexdigest()
+            existing = self.find_stored_copy(sha256)
+            if existing:
+                return self._deduplicated_result(existing, filename)
+            
             file_key = self.generate_file_key(filename)
             content_type = self.get_content_type(filename)
             
             success = self.s3_client.upload_file(file_content, file_key, content_type)
             
             if success:
+                counter = RowCounter()
+                counter.update(file_content)
+                self._record_upload(file_key, filename, counter, sha256, uploaded_by)
                 return {
                     'success': True,
                     'file_key': file_key,
                     'original_filename': filename,
                     'size_bytes': len(file_content),
                     'content_type': content_type,
-                    'uploaded_at': datetime.now().isoformat()
+                    'uploaded_at': datetime.now(timezone.utc).isoformat(),
+                    'sha256': sha256,
+                    'deduplicated': False
                 }
             else:
                 return {
@@ -75,6 +214,340 @@ class BulkDataService:
                 'error': f'Upload failed: {str(e)}'
             }
     
+    async def _observe(self, chunks: AsyncIterator[bytes], *observers) -> AsyncIterator[bytes]:
+        # pass chunks through unchanged while feeding them to observers (row counters, hashes)
+        # on a worker thread, so scanning a part doesn't stall the event loop
+        async for chunk in chunks:
+            await asyncio.to_thread(self._feed, observers, chunk)
+            yield chunk
+    
+    @staticmethod
+    def _feed(observers, chunk: bytes):
+        for observer in observers:
+            observer.update(chunk)
+    
+    async def _iter_parts(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        # regroup an arbitrary chunk stream into part_size blocks (last block may be short)
+        buffer = bytearray()
+        async for chunk in chunks:
+            buffer.extend(chunk)
+            while len(buffer) >= self.part_size:
+                yield bytes(buffer[:self.part_size])
+                del buffer[:self.part_size]
+        if buffer:
+            yield bytes(buffer)
+    
+    async def upload_bulk_stream(self, chunks: AsyncIterator[bytes], filename: str,
+                                 sha256: Optional[str] = None, uploaded_by: Optional[str] = None) -> Optional[Dict]:
+        # stream a bulk file to S3 via multipart upload; memory stays at ~(concurrency + 1) parts.
+        # a digest known up front (e.g. from a spooled upload) skips the transfer for known content
+        if not self.validate_file_type(filename):
+            return {
+                'success': False,
+                'error': f'File type not allowed. Supported: {", ".join(self.allowed_file_types.keys())}'
+            }
+        
+        if sha256:
+            existing = await self.executor.run(self.find_stored_copy, sha256)
+            if existing:
+                return self._deduplicated_result(existing, filename)
+        
+        file_key = self.generate_file_key(filename)
+        content_type = self.get_content_type(filename)
+        counter = RowCounter()
+        digest = hashlib.sha256()
+        # observe whole parts rather than request chunks: one thread hop per part
+        parts = self._observe(self._iter_parts(chunks), counter, digest)
+        
+        first = await anext(parts, b'')
+        size = len(first)
+        if size < self.part_size:
+            # whole file fits in one part: a single PUT is cheaper than a multipart upload
+            success = await self.executor.run(self.s3_client.upload_file, first, file_key, content_type)
+        else:
+            success, size = await self._multipart_upload(first, parts, file_key, content_type)
+        
+        if not success:
+            return {
+                'success': False,
+                'error': 'Failed to upload file to S3'
+            }
+        
+        sha256 = digest.hexdigest()
+        existing = await self.executor.run(self.find_stored_copy, sha256)
+        if existing and existing['file_key'] != file_key:
+            # same content already stored: keep the original and drop the copy we just wrote
+            await self.executor.run(self.s3_client.delete_file, file_key)
+            return self._deduplicated_result(existing, filename)
+        
+        await self.executor.run(self._record_upload, file_key, filename, counter, sha256, uploaded_by)
+        
+        return {
+            'success': True,
+            'file_key': file_key,
+            'original_filename': filename,
+            'size_bytes': size,
+            'content_type': content_type,
+            'uploaded_at': datetime.now(timezone.utc).isoformat(),
+            'sha256': sha256,
+            'deduplicated': False
+        }
+    
+    async def _multipart_upload(self, first: bytes, parts: AsyncIterator[bytes], file_key: str, content_type: str):
+        # upload parts concurrently; the semaphore caps how many part buffers are held at once
+        upload_id = await self.executor.run(self.s3_client.create_multipart_upload, file_key, content_type)
+        if not upload_id:
+            return False, 0
+        
+        slots = asyncio.Semaphore(self.upload_concurrency)
+        tasks = []
+        size = 0
+        
+        async def send_part(part_number: int, data: bytes) -> Optional[str]:
+            try:
+                return await self.executor.run(self.s3_client.upload_part, file_key, upload_id, part_number, data)
+            finally:
+                slots.release()
+        
+        try:
+            part_number = 0
+            data = first
+            while data:
+                part_number += 1
+                await slots.acquire()
+                tasks.append(asyncio.create_task(send_part(part_number, data)))
+                size += len(data)
+                data = await anext(parts, b'')
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            await self.executor.run(self.s3_client.abort_multipart_upload, file_key, upload_id)
+            raise
+        
+        etags = await asyncio.gather(*tasks, return_exceptions=True)
+        if any(not isinstance(etag, str) for etag in etags):
+            await self.executor.run(self.s3_client.abort_multipart_upload, file_key, upload_id)
+            return False, size
+        
+        success = await self.executor.run(self.s3_client.complete_multipart_upload, file_key, upload_id, list(etags))
+        if not success:
+            await self.executor.run(self.s3_client.abort_multipart_upload, file_key, upload_id)
+        return success, size
+    
+    def create_upload_url(self, filename: str, size: Optional[int] = None, content_type: Optional[str] = None,
+                          uploaded_by: Optional[str] = None, expiration: int = 900) -> Dict:
+        # issue a presigned POST so the client uploads directly to S3
+        if not self.validate_file_type(filename):
+            return {
+                'success': False,
+                'error': f'File type not allowed. Supported: {", ".join(self.allowed_file_types.keys())}'
+            }
+        
+        expected_type = self.get_content_type(filename)
+        if content_type and content_type != expected_type:
+            return {
+                'success': False,
+                'error': f'Content type {content_type} does not match {expected_type} for this file'
+            }
+        
+        if size is not None and not 0 < size <= self.max_upload_size:
+            return {
+                'success': False,
+                'error': f'File size must be between 1 and {self.max_upload_size} bytes'
+            }
+        
+        file_key = self.generate_file_key(filename)
+        max_size = size or self.max_upload_size
+        metadata = {'original-filename': filename}
+        if uploaded_by:
+            metadata['uploaded-by'] = uploaded_by
+        
+        upload = self.s3_client.generate_upload_post(file_key, expected_type, max_size, metadata, expiration)
+        if not upload:
+            return {
+                'success': False,
+                'error': 'Failed to generate upload URL'
+            }
+        
+        return {
+            'success': True,
+            'file_key': file_key,
+            'upload_url': upload['url'],
+            'fields': upload['fields'],
+            'content_type': expected_type,
+            'max_size_bytes': max_size,
+            'expires_in': expiration
+        }
+    
+    def register_upload(self, file_key: str, uploaded_by: Optional[str] = None) -> Dict:
+        # confirm a direct-to-S3 upload landed and return its metadata. only keys issued by
+        # create_upload_url qualify, and only the user the upload URL was issued to can register one
+        if not file_key.startswith(UPLOAD_PREFIX) or not self.validate_file_type(file_key):
+            return {
+                'success': False,
+                'code': 'INVALID_FILE_KEY',
+                'error': 'Invalid file key'
+            }
+        
+        info = self.s3_client.get_file_metadata(file_key)
+        if not info:
+            return {
+                'success': False,
+                'code': 'FILE_NOT_FOUND',
+                'error': 'File not found'
+            }
+        
+        if not uploaded_by or info['metadata'].get('uploaded-by') != uploaded_by:
+            return {
+                'success': False,
+                'code': 'FORBIDDEN',
+                'error': 'File was not uploaded by the current user'
+            }
+        
+        result = {
+            'file_key': file_key,
+            'original_filename': info['metadata'].get('original-filename', file_key),
+            'uploaded_by': info['metadata'].get('uploaded-by'),
+            'size_bytes': info['size'],
+            'content_type': info['content_type'],
+            'uploaded_at': info['last_modified']
+        }
+        if self.manifest:
+            self.manifest.put(**result)
+        
+        # row count and content digest are computed off the request path
+        self.scan_in_background(file_key)
+        
+        return {'success': True, **result}
+    
+    def _metadata_key(self, file_key: str) -> str:
+        return f"{META_PREFIX}{file_key}.json"
+    
+    def get_file_info(self, file_key: str) -> Optional[Dict]:
+        # read the cached sidecar metadata (row count etc.) for a stored file
+        info = self._metadata_cache.get(file_key)
+        if info is None:
+            content = self.s3_client.download_file(self._metadata_key(file_key))
+            if not content:
+                return None
+            info = json.loads(content)
+            self._metadata_cache.set(file_key, info)
+        return info
+    
+    def update_file_info(self, file_key: str, **fields) -> Dict:
+        # merge fields into a file's sidecar metadata and write it back
+        info = {**(self.get_file_info(file_key) or {}), **fields}
+        self.s3_client.upload_file(json.dumps(info).encode('utf-8'), self._metadata_key(file_key), 'application/json')
+        self._metadata_cache.set(file_key, info)
+        return info
+    
+    def _digest_key(self, sha256: str) -> str:
+        return f"{DIGEST_PREFIX}{sha256}.json"
+    
+    def find_by_digest(self, sha256: str) -> Optional[Dict]:
+        # look up the stored file with this content digest (positive hits are cached)
+        entry = self._digest_cache.get(sha256)
+        if entry is None:
+            content = self.s3_client.download_file(self._digest_key(sha256))
+            if not content:
+                return None
+            entry = json.loads(content)
+            self._digest_cache.set(sha256, entry)
+        return entry
+    
+    def find_stored_copy(self, sha256: str) -> Optional[Dict]:
+        # digest hit for deduplication, only if its file is still in the bucket (checked uncached);
+        # an entry whose file is gone is dropped so the next copy uploaded becomes the indexed one
+        entry = self.find_by_digest(sha256)
+        if entry:
+            exists = self.s3_client.file_exists(entry['file_key'])
+            if exists is False:
+                self._remove_digest_entry(sha256)
+            if not exists:
+                return None
+        return entry
+    
+    def _remove_digest_entry(self, digest: str):
+        self.s3_client.delete_file(self._digest_key(digest))
+        self._digest_cache.pop(digest)
+    
+    def update_digest_entry(self, digest: str, **fields) -> Dict:
+        # merge fields into a digest index entry (e.g. which import job already processed it)
+        entry = {**(self.find_by_digest(digest) or {}), **fields}
+        self.s3_client.upload_file(json.dumps(entry).encode('utf-8'), self._digest_key(digest), 'application/json')
+        self._digest_cache.set(digest, entry)
+        return entry
+    
+    def _deduplicated_result(self, existing: Dict, filename: str) -> Dict:
+        # upload response pointing at the previously stored copy
+        return {
+            'success': True,
+            'file_key': existing['file_key'],
+            'original_filename': filename,
+            'size_bytes': existing.get('size_bytes'),
+            'content_type': self.get_content_type(filename),
+            'uploaded_at': existing.get('uploaded_at'),
+            'sha256': existing.get('sha256'),
+            'deduplicated': True
+        }
+    
+    def _record_upload(self, file_key: str, filename: str, counter: RowCounter, sha256: Optional[str] = None,
+                       uploaded_by: Optional[str] = None):
+        # store upload-time metadata; row counts and digests come for free from the bytes we already streamed
+        fields = {
+            'original_filename': filename,
+            'size_bytes': counter.size,
+            'uploaded_at': datetime.now(timezone.utc).isoformat()
+        }
+        if filename.rsplit('.', 1)[-1].lower() in ROW_COUNTED_TYPES:
+            fields['row_count'] = counter.rows
+        if sha256:
+            fields['sha256'] = sha256
+        try:
+            self.update_file_info(file_key, **fields)
+            if self.manifest:
+                self.manifest.put(file_key, uploaded_by=uploaded_by, content_type=self.get_content_type(filename), **fields)
+            if sha256 and not self.find_by_digest(sha256):
+                self.update_digest_entry(sha256, file_key=file_key, sha256=sha256,
+                                         size_bytes=counter.size, uploaded_at=fields['uploaded_at'])
+        except Exception as e:
+            print(f"Failed to record metadata for {file_key}: {e}")
+    
+    def scan_in_background(self, file_key: str) -> bool:
+        # schedule a one-off streaming pass (row count + digest) for files uploaded around the API
+        with self._counting_lock:
+            if file_key in self._counting:
+                return False
+            self._counting.add(file_key)
+        threading.Thread(target=self._scan_file, args=(file_key,), daemon=True).start()
+        return True
+    
+    def _scan_file(self, file_key: str):
+        try:
+            body = self.s3_client.open_stream(file_key)
+            if body is None:
+                return
+            counter = RowCounter()
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: body.read(1024 * 1024), b''):
+                counter.update(chunk)
+                digest.update(chunk)
+            
+            fields = {'size_bytes': counter.size, 'sha256': digest.hexdigest()}
+            if file_key.rsplit('.', 1)[-1].lower() in ROW_COUNTED_TYPES:
+                fields['row_count'] = counter.rows
+            info = self.update_file_info(file_key, **fields)
+            if self.manifest:
+                self.manifest.update(file_key, **fields)
+            if not self.find_by_digest(fields['sha256']):
+                self.update_digest_entry(fields['sha256'], file_key=file_key, sha256=fields['sha256'],
+                                         size_bytes=counter.size, uploaded_at=info.get('uploaded_at'))
+        except Exception as e:
+            print(f"File scan failed for {file_key}: {e}")
+        finally:
+            with self._counting_lock:
+                self._counting.discard(file_key)
+    
     def download_bulk_file(self, file_key: str) -> Optional[Dict]:
         # download a stored bulk file and return metadata
         try:
@@ -86,7 +559,7 @@ class BulkDataService:
                     'file_key': file_key,
                     'content': file_content,
                     'size_bytes': len(file_content),
-                    'downloaded_at': datetime.now().isoformat()
+                    'downloaded_at': datetime.now(timezone.utc).isoformat()
                 }
             else:
                 return {
@@ -100,42 +573,99 @@ class BulkDataService:
                 'error': f'Download failed: {str(e)}'
             }
     
-    def list_files(self) -> List[Dict]:
-        # list files stored in S3 and attempt to recover original filenames
-        try:
-            files = self.s3_client.list_files("")
-            
-            enriched_files = []
-            for file_info in files:
+    def list_files(self, prefix: str = '', date: Optional[str] = None, cursor: Optional[str] = None,
+                   limit: int = 100, uploaded_by: Optional[str] = None, file_type: Optional[str] = None,
+                   min_size: Optional[int] = None, max_size: Optional[int] = None) -> Dict:
+        # list one page of stored files, from the manifest when configured, otherwise from the bucket.
+        # in both modes `prefix` matches the start of the full file key and `date` the UTC upload day
+        limit = max(1, min(limit, MAX_LIST_PAGE_SIZE))
+        if date:
+            # validates the format; the manifest matches on the ISO date itself
+            date_prefix = self.date_prefix(date)
+        
+        if self.manifest:
+            page = self.manifest.query(prefix, date, uploaded_by, file_type, min_size, max_size, cursor, limit)
+            return {
+                'files': [self._manifest_file(entry) for entry in page['files']],
+                'next_cursor': page['next_cursor']
+            }
+        
+        if uploaded_by or file_type or min_size is not None or max_size is not None:
+            raise ValueError("Filtering by uploader, type or size requires the file manifest (AWS_DYNAMODB_MANIFEST_TABLE)")
+        if date:
+            # both have to match: list under whichever is narrower, or nothing if they disagree
+            if date_prefix.startswith(prefix):
+                prefix = date_prefix
+            elif not prefix.startswith(date_prefix):
+                return {'files': [], 'next_cursor': None}
+        
+        if prefix.startswith(INTERNAL_PREFIXES):
+            return {'files': [], 'next_cursor': None}
+        
+        # the cursor is the last key returned. sidecar and snapshot keys share the bucket but sort in
+        # contiguous blocks, so rather than filtering them out of a page (which can leave it empty),
+        # listing resumes past a block as soon as it reaches one
+        files = []
+        position = cursor
+        while True:
+            page = self.s3_client.list_files_page(
+                prefix=prefix,
+                max_keys=limit - len(files),
+                start_after=position
+            )
+            more = page['next_token'] is not None
+            for file_info in page['files']:
+                internal = next((p for p in INTERNAL_PREFIXES if file_info['key'].startswith(p)), None)
+                if internal:
+                    # '0' is the character after '/', so this sorts after every key in the block
+                    position = internal[:-1] + '0'
+                    more = True
+                    break
                 enriched_file = file_info.copy()
-                
-                filename = file_info['key']
-                if '_' in filename:
-                    parts = filename.split('_', 3)
-                    if len(parts) == 4:
-                        enriched_file['original_filename'] = parts[3]
-                    else:
-                        enriched_file['original_filename'] = filename
-                else:
-                    enriched_file['original_filename'] = filename
-                    
-                enriched_files.append(enriched_file)
-            
-            return enriched_files
-            
-        except Exception as e:
-            return []
+                enriched_file['original_filename'] = self.original_filename(file_info['key'])
+                files.append(enriched_file)
+                position = file_info['key']
+            if len(files) >= limit or not more:
+                break
+        
+        return {
+            'files': files,
+            'next_cursor': position if more else None
+        }
+    
+    def _manifest_file(self, entry: Dict) -> Dict:
+        # manifest entry in the same shape as a bucket listing, plus the recorded upload details
+        return {
+            'key': entry['file_key'],
+            'size': entry.get('size_bytes'),
+            'last_modified': entry.get('uploaded_at'),
+            'original_filename': entry.get('original_filename') or self.original_filename(entry['file_key']),
+            'uploaded_by': entry.get('uploaded_by'),
+            'content_type': entry.get('content_type'),
+            'file_type': entry.get('file_type'),
+            'row_count': entry.get('row_count'),
+            'sha256': entry.get('sha256')
+        }
     
     def delete_bulk_file(self, file_key: str) -> Dict:
-        # delete a stored file from S3
+        # delete a stored file from S3, along with its sidecar metadata and digest index entry
         try:
+            sha256 = (self.get_file_info(file_key) or {}).get('sha256')
             success = self.s3_client.delete_file(file_key)
             
             if success:
+                self._exists_cache.pop(file_key)
+                self.s3_client.delete_file(self._metadata_key(file_key))
+                self._metadata_cache.pop(file_key)
+                # the index points at the first stored copy; other keys with the same content keep it
+                if sha256 and (self.find_by_digest(sha256) or {}).get('file_key') == file_key:
+                    self._remove_digest_entry(sha256)
+                if self.manifest:
+                    self.manifest.delete(file_key)
                 return {
                     'success': True,
                     'message': f'File deleted successfully: {file_key}',
-                    'deleted_at': datetime.now().isoformat()
+                    'deleted_at': datetime.now(timezone.utc).isoformat()
                 }
             else:
                 return {
@@ -149,12 +679,55 @@ class BulkDataService:
                 'error': f'Delete failed: {str(e)}'
             }
     
-    def get_download_url(self, file_key: str, expiration: int = 3600) -> Optional[str]:
-        # return a presigned download URL for a file
-        return self.s3_client.get_file_url(file_key, expiration)
+    def file_exists(self, file_key: str) -> Optional[bool]:
+        # HeadObject-backed existence check, cached for a few seconds; None when S3 couldn't say
+        # (throttling, network). only definite answers are cached, so a failed HEAD is retried next call
+        exists = self._exists_cache.get(file_key)
+        if exists is None:
+            exists = self.s3_client.file_exists(file_key)
+            if exists is not None:
+                self._exists_cache.set(file_key, exists)
+        return exists
+    
+    def get_download_url(self, file_key: str, expiration: int = 3600, check_exists: bool = False) -> Optional[str]:
+        # return a presigned download URL, reusing a cached one while it has enough validity left
+        if check_exists and not self.file_exists(file_key):
+            return None
+        
+        cache_key = (file_key, expiration)
+        url = self._url_cache.get(cache_key)
+        if url is None:
+            url = self.s3_client.get_file_url(file_key, expiration)
+            if url:
+                self._url_cache.set(cache_key, url, ttl=expiration * (1 - self.url_refresh_margin))
+        return url
+    
+    def _read_head_lines(self, file_key: str, min_lines: int) -> Optional[Dict]:
+        # ranged GETs that grow until `min_lines` complete lines are available (or the cap/EOF is hit)
+        length = self.preview_range_bytes
+        while True:
+            chunk = self.s3_client.get_range(file_key, 0, length - 1)
+            if chunk is None:
+                return None
+            
+            content = chunk['content']
+            at_eof = len(content) >= chunk['total_size']
+            if not at_eof:
+                # drop the trailing partial line (and any split multi-byte character with it)
+                content = content[:content.rfind(b'\n') + 1]
+                if not content and length >= self.preview_max_bytes:
+                    raise ValueError(f"First line is longer than the {self.preview_max_bytes}-byte preview limit")
+            
+            if at_eof or content.count(b'\n') >= min_lines or length >= self.preview_max_bytes:
+                return {
+                    'text': content.decode('utf-8-sig', errors='replace'),
+                    'bytes_read': len(chunk['content']),
+                    'total_size': chunk['total_size']
+                }
+            length = min(length * 4, self.preview_max_bytes)
     
     def preview_csv_content(self, file_key: str, max_rows: int = 10) -> Optional[Dict]:
-        # preview a CSV file's headers and a small sample of rows
+        # preview a CSV file's headers and a small sample of rows using ranged reads
         try:
             if not file_key.lower().endswith('.csv'):
                 return {
@@ -162,30 +735,72 @@ class BulkDataService:
                     'error': 'File is not a CSV file'
                 }
             
-            file_content = self.s3_client.download_file(file_key)
-            if not file_content:
+            head = self._read_head_lines(file_key, max_rows + 1)
+            if head is None:
                 return {
                     'success': False,
                     'error': 'Failed to download file for preview'
                 }
             
-            csv_text = file_content.decode('utf-8')
-            csv_reader = csv.reader(StringIO(csv_text))
-            
-            rows = list(csv_reader)
+            rows = list(itertools.islice(csv.reader(StringIO(head['text'])), max_rows + 1))
             if not rows:
                 return {
                     'success': False,
                     'error': 'CSV file is empty'
                 }
             
-            headers = rows[0] if rows else []
-            sample_rows = rows[1:max_rows+1] if len(rows) > 1 else []
+            headers = rows[0]
+            sample_rows = rows[1:]
+            
+            # the full count comes from upload-time metadata, or a background count if missing
+            info = self.get_file_info(file_key) or {}
+            total_rows = info.get('row_count')
+            if total_rows is None:
+                self.scan_in_background(file_key)
             
             return {
                 'success': True,
                 'file_key': file_key,
-                'total_rows': len(rows) - 1,  # Exclude header
+                'total_rows': total_rows,
+                'row_count_pending': total_rows is None,
+                'headers': headers,
+                'sample_rows': sample_rows,
+                'preview_rows': len(sample_rows),
+                'bytes_read': head['bytes_read'],
+                'size_bytes': head['total_size']
+            }
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': f'Preview failed: {str(e)}'
+            }
+    
+    def preview_xlsx_content(self, file_key: str, max_rows: int = 10, sheet: Optional[str] = None) -> Optional[Dict]:
+        # preview an Excel sheet by streaming only its first rows
+        try:
+            reader = open_xlsx(self.s3_client, file_key, sheet)
+            rows = list(itertools.islice(reader.rows(), max_rows + 1))
+            if not rows:
+                return {
+                    'success': False,
+                    'error': 'Worksheet is empty'
+                }
+            
+            headers = rows[0]
+            sample_rows = rows[1:]
+            
+            # the sheet's <dimension> gives the row count without reading the rows
+            total_rows = reader.row_count_hint()
+            if total_rows is None:
+                total_rows = (self.get_file_info(file_key) or {}).get('row_count')
+            
+            return {
+                'success': True,
+                'file_key': file_key,
+                'sheet': sheet,
+                'total_rows': total_rows,
+                'row_count_pending': False,
                 'headers': headers,
                 'sample_rows': sample_rows,
                 'preview_rows': len(sample_rows)
@@ -197,6 +812,12 @@ class BulkDataService:
                 'error': f'Preview failed: {str(e)}'
             }
     
+    def preview_file(self, file_key: str, max_rows: int = 10) -> Optional[Dict]:
+        # dispatch to the CSV or XLSX preview based on the file extension
+        if file_key.lower().endswith('.xlsx'):
+            return self.preview_xlsx_content(file_key, max_rows)
+        return self.preview_csv_content(file_key, max_rows)
+    
     def get_supported_file_types(self) -> List[str]:
         # return keys of supported file types
         return list(self.allowed_file_types.keys())
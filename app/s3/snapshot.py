@@ -0,0 +1,186 @@
+import os
+import csv
+import gzip
+import json
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+from .service import SNAPSHOT_PREFIX
+
+# Catalog snapshots: a parallel table scan written to S3 as gzip CSV/NDJSON and (optionally) Parquet
+
+LATEST_KEY = f'{SNAPSHOT_PREFIX}latest.json'
+SNAPSHOT_COLUMNS = [
+    'id', 'name', 'description', 'price', 'category', 'sku', 'in_stock', 'reorder_level',
+    'supplier', 'image_url', 'is_active', 'created_at', 'updated_at'
+]
+
+
+class _CsvGzipWriter:
+    def __init__(self, path: str):
+        self._file = gzip.open(path, 'wt', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=SNAPSHOT_COLUMNS, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _NdjsonGzipWriter:
+    def __init__(self, path: str):
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+
+    def write(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            self._file.write(json.dumps(row, default=str))
+            self._file.write('\n')
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter:
+    # one row group per batch, so only a batch of rows is ever held in memory
+    def __init__(self, path: str):
+        self.schema = pa.schema([
+            ('id', pa.string()), ('name', pa.string()), ('description', pa.string()),
+            ('price', pa.float64()), ('category', pa.string()), ('sku', pa.string()),
+            ('in_stock', pa.int64()), ('reorder_level', pa.int64()), ('supplier', pa.string()),
+            ('image_url', pa.string()), ('is_active', pa.bool_()),
+            ('created_at', pa.string()), ('updated_at', pa.string())
+        ])
+        self._writer = pq.ParquetWriter(path, self.schema, compression='snappy')
+
+    def _column(self, rows: List[Dict[str, Any]], field) -> List[Any]:
+        values = [row.get(field.name) for row in rows]
+        if pa.types.is_floating(field.type):
+            return [float(v) if v is not None else None for v in values]
+        if pa.types.is_integer(field.type):
+            return [int(v) if v is not None else None for v in values]
+        if pa.types.is_string(field.type):
+            return [str(v) if v is not None else None for v in values]
+        return values
+
+    def write(self, rows: List[Dict[str, Any]]):
+        columns = {field.name: self._column(rows, field) for field in self.schema}
+        self._writer.write_table(pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class CatalogSnapshotService:
+    # builds snapshots on a background thread and publishes them under snapshots/
+    FORMATS = {
+        'csv.gz': (_CsvGzipWriter, 'application/gzip'),
+        'ndjson.gz': (_NdjsonGzipWriter, 'application/gzip'),
+        'parquet': (_ParquetWriter, 'application/vnd.apache.parquet'),
+    }
+
+    def __init__(self, file_service):
+        self.file_service = file_service
+        self.s3_client = file_service.s3_client
+        self.scan_segments = int(os.getenv('SNAPSHOT_SCAN_SEGMENTS', '4'))
+        self.batch_size = int(os.getenv('SNAPSHOT_BATCH_SIZE', '10000'))
+        self.formats = [fmt for fmt in self.FORMATS if fmt != 'parquet' or pa is not None]
+        self.status = {"state": "idle", "last_error": None, "last_snapshot": None}
+        self._lock = threading.Lock()
+        self._running = False
+
+    def start_snapshot(self) -> bool:
+        # run a snapshot in the background; returns False if one is already in progress
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+            self.status["state"] = "running"
+        threading.Thread(target=self._run, name="catalog-snapshot", daemon=True).start()
+        return True
+
+    def _run(self):
+        try:
+            self.status["last_snapshot"] = self.create_snapshot()
+            self.status["last_error"] = None
+        except Exception as e:
+            print(f"Catalog snapshot failed: {e}")
+            self.status["last_error"] = str(e)
+        finally:
+            with self._lock:
+                self._running = False
+                self.status["state"] = "idle"
+
+    def create_snapshot(self) -> Dict[str, Any]:
+        # scan once, fan rows out to every format writer, then upload the finished files
+        from ..dynamodb_client import get_db_client
+
+        started = datetime.now()
+        base_key = f"{SNAPSHOT_PREFIX}{started.strftime('%Y/%m/%d/%H%M%S')}/products"
+        row_count = 0
+
+        with tempfile.TemporaryDirectory(prefix='catalog-snapshot-') as workdir:
+            paths = {fmt: os.path.join(workdir, f'products.{fmt}') for fmt in self.formats}
+            writers = {fmt: self.FORMATS[fmt][0](path) for fmt, path in paths.items()}
+            try:
+                batch = []
+                for item in get_db_client().parallel_scan(self.scan_segments):
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        for writer in writers.values():
+                            writer.write(batch)
+                        row_count += len(batch)
+                        batch = []
+                if batch:
+                    for writer in writers.values():
+                        writer.write(batch)
+                    row_count += len(batch)
+            finally:
+                for writer in writers.values():
+                    writer.close()
+
+            files = {}
+            for fmt, path in paths.items():
+                file_key = f"{base_key}.{fmt}"
+                with open(path, 'rb') as fileobj:
+                    if not self.s3_client.upload_fileobj(fileobj, file_key, self.FORMATS[fmt][1]):
+                        raise IOError(f"Failed to upload snapshot file {file_key}")
+                files[fmt] = {"file_key": file_key, "size_bytes": os.path.getsize(path)}
+
+        snapshot = {
+            "created_at": started.isoformat(),
+            "completed_at": datetime.now().isoformat(),
+            "row_count": row_count,
+            "files": files
+        }
+        self.s3_client.upload_file(json.dumps(snapshot).encode('utf-8'), LATEST_KEY, 'application/json')
+        return snapshot
+
+    def get_latest(self, expiration: int = 3600) -> Optional[Dict[str, Any]]:
+        # latest published snapshot, with presigned download URLs for each format
+        content = self.s3_client.download_file(LATEST_KEY)
+        if not content:
+            return None
+        snapshot = json.loads(content)
+        for info in snapshot["files"].values():
+            info["download_url"] = self.file_service.get_download_url(info["file_key"], expiration)
+        return snapshot
+
+
+_service = None
+
+def get_snapshot_service(file_service):
+    # return shared CatalogSnapshotService instance
+    global _service
+    if not _service:
+        _service = CatalogSnapshotService(file_service)
+    return _service
@@ -0,0 +1,246 @@
+import io
+import os
+import re
+import sys
+import zipfile
+import tempfile
+import posixpath
+import xml.etree.ElementTree as ET
+from array import array
+from typing import Dict, Iterator, List, Optional
+from .s3_client import S3Client
+
+# Read-only, row-streaming XLSX parsing on top of ranged S3 reads (stdlib only)
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+CELL_REF = re.compile(r'([A-Z]+)(\d+)')
+
+
+class S3RangeFile(io.RawIOBase):
+    # seekable file over an S3 object; zipfile jumps to the central directory at the end,
+    # so ranged GETs of `block_size` replace downloading the whole workbook
+    def __init__(self, s3_client: S3Client, file_key: str, block_size: int = 1024 * 1024):
+        info = s3_client.get_file_metadata(file_key)
+        if info is None:
+            raise FileNotFoundError(f"File not found: {file_key}")
+        self.s3_client = s3_client
+        self.file_key = file_key
+        self.size = info['size']
+        self.block_size = block_size
+        self._pos = 0
+        self._block_start = 0
+        self._block = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self.size + offset
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        if self._pos >= self.size:
+            return 0
+        if not self._block_start <= self._pos < self._block_start + len(self._block):
+            end = min(self._pos + max(self.block_size, len(buffer)), self.size) - 1
+            chunk = self.s3_client.get_range(self.file_key, self._pos, end)
+            if chunk is None:
+                raise IOError(f"Ranged read failed for {self.file_key}")
+            self._block_start = self._pos
+            self._block = chunk['content']
+        offset = self._pos - self._block_start
+        data = self._block[offset:offset + len(buffer)]
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+class SharedStrings:
+    # a workbook's shared string table. strings are kept in memory up to `memory_limit` bytes and the
+    # rest spill to an anonymous temp file, read back by offset, so a huge table can't exhaust memory
+    def __init__(self, memory_limit: Optional[int] = None):
+        self.memory_limit = memory_limit if memory_limit is not None else \
+            int(os.getenv('XLSX_SHARED_STRINGS_MEMORY_MB', '64')) * 1024 * 1024
+        self._strings = []
+        self._size = 0
+        self._spill = None
+        # start offset of each spilled string, plus the end of the last one
+        self._offsets = array('q', [0])
+
+    def append(self, text: str):
+        if self._spill is None:
+            self._size += sys.getsizeof(text) + 8
+            if self._size <= self.memory_limit:
+                self._strings.append(text)
+                return
+            self._spill = tempfile.TemporaryFile()
+        data = text.encode('utf-8')
+        self._spill.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def __len__(self) -> int:
+        return len(self._strings) + len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < len(self._strings):
+            return self._strings[index]
+        spilled = index - len(self._strings)
+        if spilled >= len(self._offsets) - 1:
+            raise IndexError(f"Shared string {index} out of range")
+        start = self._offsets[spilled]
+        self._spill.seek(start)
+        return self._spill.read(self._offsets[spilled + 1] - start).decode('utf-8')
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for letter in letters:
+        index = index * 26 + (ord(letter) - 64)
+    return index - 1
+
+
+def _format_number(text: str) -> str:
+    # integral numbers come back as "3" rather than "3.0" so they still parse as ints downstream
+    try:
+        number = float(text)
+    except ValueError:
+        return text
+    return str(int(number)) if number.is_integer() and 'E' not in text.upper() else text
+
+
+class XlsxReader:
+    # streams rows of one worksheet as lists of strings (None for empty cells)
+    def __init__(self, fileobj, sheet: Optional[str] = None, shared_strings_memory: Optional[int] = None):
+        self.zip = zipfile.ZipFile(fileobj)
+        self.shared_strings_memory = shared_strings_memory
+        self.sheet_path = self._resolve_sheet(sheet)
+        self.dimension = None
+        self._shared_strings = None
+
+    def _resolve_sheet(self, sheet: Optional[str]) -> str:
+        # map a sheet name (default: the first sheet) to its part inside the archive
+        workbook = ET.fromstring(self.zip.read('xl/workbook.xml'))
+        rels = ET.fromstring(self.zip.read('xl/_rels/workbook.xml.rels'))
+        targets = {rel.get('Id'): rel.get('Target') for rel in rels.iter(f'{NS_PKG_REL}Relationship')}
+
+        sheets = list(workbook.iter(f'{NS_MAIN}sheet'))
+        if not sheets:
+            raise ValueError("Workbook has no sheets")
+        chosen = next((s for s in sheets if s.get('name') == sheet), None) if sheet else sheets[0]
+        if chosen is None:
+            raise ValueError(f"Sheet not found: {sheet}")
+
+        target = targets[chosen.get(f'{NS_REL}id')]
+        return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+
+    def _load_shared_strings(self) -> SharedStrings:
+        # the shared string table is needed to resolve cell text; past the memory limit it lives on disk
+        if self._shared_strings is None:
+            strings = SharedStrings(self.shared_strings_memory)
+            if 'xl/sharedStrings.xml' in self.zip.namelist():
+                with self.zip.open('xl/sharedStrings.xml') as part:
+                    for _, elem in ET.iterparse(part):
+                        if elem.tag == f'{NS_MAIN}si':
+                            strings.append(''.join(t.text or '' for t in elem.iter(f'{NS_MAIN}t')))
+                            elem.clear()
+            self._shared_strings = strings
+        return self._shared_strings
+
+    def _cell_value(self, cell) -> Optional[str]:
+        cell_type = cell.get('t')
+        if cell_type == 'inlineStr':
+            return ''.join(t.text or '' for t in cell.iter(f'{NS_MAIN}t'))
+        value = cell.find(f'{NS_MAIN}v')
+        if value is None or value.text is None:
+            return None
+        if cell_type == 's':
+            return self._load_shared_strings()[int(value.text)]
+        if cell_type == 'b':
+            return 'true' if value.text == '1' else 'false'
+        if cell_type in ('str', 'e'):
+            return value.text
+        return _format_number(value.text)
+
+    def rows(self) -> Iterator[List[Optional[str]]]:
+        # yield each row in sheet order; processed XML elements are discarded as we go
+        self._load_shared_strings()
+        with self.zip.open(self.sheet_path) as part:
+            sheet_data = None
+            expected_row = 1
+            for event, elem in ET.iterparse(part, events=('start', 'end')):
+                if event == 'start':
+                    if elem.tag == f'{NS_MAIN}sheetData':
+                        sheet_data = elem
+                    elif elem.tag == f'{NS_MAIN}dimension':
+                        self.dimension = elem.get('ref')
+                    continue
+                if elem.tag != f'{NS_MAIN}row':
+                    continue
+
+                row_number = int(elem.get('r', expected_row))
+                # rows that Excel left out entirely are empty rows
+                while expected_row < row_number:
+                    yield []
+                    expected_row += 1
+
+                values = []
+                for position, cell in enumerate(elem.iter(f'{NS_MAIN}c')):
+                    match = CELL_REF.match(cell.get('r', ''))
+                    column = _column_index(match.group(1)) if match else position
+                    values.extend([None] * (column - len(values)))
+                    values.append(self._cell_value(cell))
+                yield values
+
+                expected_row = row_number + 1
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+    def row_count_hint(self) -> Optional[int]:
+        # data rows implied by the sheet's <dimension> (header excluded), read from the first bytes of the sheet
+        if self.dimension is None:
+            with self.zip.open(self.sheet_path) as part:
+                for event, elem in ET.iterparse(part, events=('start',)):
+                    if elem.tag == f'{NS_MAIN}dimension':
+                        self.dimension = elem.get('ref')
+                        break
+                    if elem.tag == f'{NS_MAIN}sheetData':
+                        break
+        if not self.dimension or ':' not in self.dimension:
+            return None
+        match = CELL_REF.match(self.dimension.split(':')[1])
+        return max(int(match.group(2)) - 1, 0) if match else None
+
+
+def iter_xlsx_dict_rows(reader: XlsxReader) -> Iterator[Dict[str, Optional[str]]]:
+    # like csv.DictReader: the first row is the header, blank rows are skipped
+    rows = reader.rows()
+    headers = next(rows, None)
+    if not headers:
+        return
+    for values in rows:
+        if not any(values):
+            continue
+        yield {header: (values[i] if i < len(values) else None) for i, header in enumerate(headers) if header}
+
+
+def open_xlsx(s3_client: S3Client, file_key: str, sheet: Optional[str] = None) -> XlsxReader:
+    # open a stored workbook through ranged reads
+    return XlsxReader(io.BufferedReader(S3RangeFile(s3_client, file_key), buffer_size=64 * 1024), sheet)
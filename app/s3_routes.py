@@ -1,19 +1,63 @@
-from fastapi import APIRouter, File, UploadFile, Depends
+import hashlib
+from typing import Optional
+from fastapi import APIRouter, File, UploadFile, Depends, Query
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from .auth import get_current_user
 from .utils import ok, bad
 from .s3.service import BulkDataService
+from .s3.importer import get_import_service
+from .s3.snapshot import get_snapshot_service
+from .s3.async_client import get_s3_executor
 
 # Routes for bulk file operations using the S3 BulkDataService
 router = APIRouter(prefix="/s3", tags=["S3"])
 
+s3 = get_s3_executor()
+
 try:
     file_service = BulkDataService()
+    import_service = get_import_service(file_service)
+    snapshot_service = get_snapshot_service(file_service)
 except:
     file_service = None
+    import_service = None
+    snapshot_service = None
+
+class UploadUrlBody(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+
+class UploadCompleteBody(BaseModel):
+    file_key: str
+
+def _uploader(current) -> str:
+    # may trigger a cached Cognito profile lookup, so callers run it off the event loop
+    return current.get("email") or current.get("sub")
+
+async def _hash_upload(file: UploadFile, chunk_size: int = 1024 * 1024) -> str:
+    # sha256 of the spooled upload, leaving the file positioned at the start
+    digest = hashlib.sha256()
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+async def _read_chunks(file: UploadFile, chunk_size: int):
+    # yield the upload in fixed-size chunks instead of reading it into memory at once
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
 
 @router.post("/upload")
 async def upload_file(file: UploadFile = File(...), current=Depends(get_current_user)):
-    # upload a file via multipart form and return the stored file key
+    # stream a multipart form upload to S3 and return the stored file key
     if not file_service:
         return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
     
@@ -21,39 +65,187 @@ async def upload_file(file: UploadFile = File(...), current=Depends(get_current_
         return bad(400, "INVALID_FILE", "Invalid file")
     
     try:
-        content = await file.read()
-        result = file_service.upload_bulk_file(content, file.filename)
+        # the form body is already spooled locally, so hashing it first lets known content skip the S3 transfer
+        sha256 = await _hash_upload(file)
+        result = await file_service.upload_bulk_stream(
+            _read_chunks(file, file_service.part_size), file.filename, sha256=sha256,
+            uploaded_by=await run_in_threadpool(_uploader, current)
+        )
         
         if not result or not result.get('success'):
             return bad(500, "UPLOAD_FAILED", "Upload failed")
         
-        return ok("File uploaded", {"file_key": result['file_key'], "size": len(content)})
+        return ok("File uploaded", {
+            "file_key": result['file_key'],
+            "size": result['size_bytes'],
+            "sha256": result['sha256'],
+            "deduplicated": result['deduplicated']
+        })
     except Exception as e:
         return bad(500, "UPLOAD_ERROR", str(e))
 
+@router.post("/upload-url")
+async def create_upload_url(body: UploadUrlBody, current=Depends(get_current_user)):
+    # return a presigned POST so the client can upload straight to S3
+    if not file_service:
+        return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
+    
+    try:
+        result = file_service.create_upload_url(
+            body.filename,
+            size=body.size,
+            content_type=body.content_type,
+            uploaded_by=await run_in_threadpool(_uploader, current)
+        )
+        if not result.get('success'):
+            return bad(400, "INVALID_FILE", result.get('error', 'Invalid file'))
+        
+        result.pop('success')
+        return ok("Upload URL generated", result)
+    except Exception as e:
+        return bad(500, "UPLOAD_URL_ERROR", str(e))
+
+@router.post("/upload-complete")
+async def complete_upload(body: UploadCompleteBody, current=Depends(get_current_user)):
+    # register a file the client uploaded directly via a presigned POST
+    if not file_service:
+        return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
+    
+    try:
+        result = await s3.run(file_service.register_upload, body.file_key,
+                              await run_in_threadpool(_uploader, current))
+        if not result.get('success'):
+            code = result.get('code', 'FILE_NOT_FOUND')
+            status = {'INVALID_FILE_KEY': 400, 'FORBIDDEN': 403}.get(code, 404)
+            return bad(status, code, result.get('error', 'File not found'))
+        
+        result.pop('success')
+        return ok("File registered", result)
+    except Exception as e:
+        return bad(500, "REGISTER_ERROR", str(e))
+
 @router.get("/files")
-async def list_files(current=Depends(get_current_user)):
-    # list uploaded files and return metadata
+async def list_files(
+    prefix: str = Query("", description="Start of the file key, e.g. uploads/2026/05/"),
+    date: Optional[str] = Query(None, description="UTC upload date: YYYY, YYYY-MM or YYYY-MM-DD"),
+    uploaded_by: Optional[str] = None,
+    file_type: Optional[str] = Query(None, description="File extension, e.g. csv"),
+    min_size: Optional[int] = Query(None, ge=0),
+    max_size: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current=Depends(get_current_user)
+):
+    # list one page of uploaded files; pass next_cursor back as cursor for the next page
     if not file_service:
         return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
     
     try:
-        files = file_service.list_files()
-        return ok(f"Retrieved {len(files)} files", files)
+        page = await s3.run(file_service.list_files, prefix, date, cursor, limit,
+                            uploaded_by, file_type, min_size, max_size)
+        return ok(f"Retrieved {len(page['files'])} files", page)
+    except ValueError as e:
+        return bad(400, "INVALID_FILTER", str(e))
     except Exception as e:
         return bad(500, "LIST_ERROR", str(e))
 
 @router.get("/download/{file_key:path}")
-async def download_file(file_key: str, current=Depends(get_current_user)):
-    # generate a presigned download URL for a stored file
+async def download_file(file_key: str, check_exists: bool = True, current=Depends(get_current_user)):
+    # generate a presigned download URL for a stored file (404 if it does not exist)
     if not file_service:
         return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
     
     try:
-        url = file_service.get_download_url(file_key)
+        if check_exists:
+            exists = await s3.run(file_service.file_exists, file_key)
+            if exists is None:
+                return bad(503, "S3_UNAVAILABLE", "Could not check whether the file exists, try again")
+            if not exists:
+                return bad(404, "FILE_NOT_FOUND", "File not found")
+        
+        url = await s3.run(file_service.get_download_url, file_key, 3600)
         if not url:
             return bad(404, "FILE_NOT_FOUND", "File not found")
         
         return ok("Download URL generated", {"download_url": url, "file_key": file_key})
     except Exception as e:
         return bad(500, "DOWNLOAD_ERROR", str(e))
+
+@router.get("/preview/{file_key:path}")
+async def preview_file(file_key: str, max_rows: int = Query(10, ge=1, le=100), current=Depends(get_current_user)):
+    # preview headers and the first rows of a stored file without downloading it
+    if not file_service:
+        return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
+    
+    try:
+        result = await s3.run(file_service.preview_file, file_key, max_rows)
+        if not result or not result.get('success'):
+            return bad(400, "PREVIEW_FAILED", (result or {}).get('error', 'Preview failed'))
+        
+        result.pop('success')
+        return ok("File preview", result)
+    except Exception as e:
+        return bad(500, "PREVIEW_ERROR", str(e))
+
+@router.post("/import/{file_key:path}", status_code=202)
+async def start_import(file_key: str, force: bool = False, current=Depends(get_current_user)):
+    # start a background job that imports products from a stored CSV/JSON/XLSX file
+    if not import_service:
+        return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
+    
+    try:
+        exists = await s3.run(file_service.file_exists, file_key)
+        if exists is None:
+            return bad(503, "S3_UNAVAILABLE", "Could not check whether the file exists, try again")
+        if not exists:
+            return bad(404, "FILE_NOT_FOUND", "File not found")
+        
+        started_by = await run_in_threadpool(_uploader, current)
+        result = await s3.run(import_service.start_import, file_key, started_by, force)
+        if result.get('duplicate'):
+            return bad(409, "ALREADY_IMPORTED", result['error'], {"imported_by_job": result['imported_by_job']})
+        if not result.get('success'):
+            return bad(400, "UNSUPPORTED_FILE", result.get('error', 'Unsupported file'))
+        
+        return ok("Import started", result['job'], status_code=202)
+    except Exception as e:
+        return bad(500, "IMPORT_ERROR", str(e))
+
+@router.get("/import/{job_id}")
+async def get_import_status(job_id: str, current=Depends(get_current_user)):
+    # report progress and per-row errors for an import job
+    if not import_service:
+        return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
+    
+    job = import_service.get_job(job_id)
+    if not job:
+        return bad(404, "JOB_NOT_FOUND", "Import job not found")
+    
+    return ok("Import job status", job)
+
+@router.post("/snapshots", status_code=202)
+async def create_snapshot(current=Depends(get_current_user)):
+    # start a background export of the product catalog to S3
+    if not snapshot_service:
+        return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
+    
+    if not snapshot_service.start_snapshot():
+        return bad(409, "SNAPSHOT_RUNNING", "A catalog snapshot is already in progress")
+    
+    return ok("Snapshot started", {"formats": snapshot_service.formats}, status_code=202)
+
+@router.get("/snapshots/latest")
+async def get_latest_snapshot(expiration: int = Query(3600, ge=60, le=604800), current=Depends(get_current_user)):
+    # describe the most recent catalog snapshot with download URLs for each format
+    if not snapshot_service:
+        return bad(503, "SERVICE_UNAVAILABLE", "S3 not configured")
+    
+    try:
+        snapshot = await s3.run(snapshot_service.get_latest, expiration)
+        if not snapshot:
+            return bad(404, "SNAPSHOT_NOT_FOUND", "No catalog snapshot has been created yet")
+        
+        snapshot["status"] = snapshot_service.status["state"]
+        return ok("Latest catalog snapshot", snapshot)
+    except Exception as e:
+        return bad(500, "SNAPSHOT_ERROR", str(e))
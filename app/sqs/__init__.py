@@ -1,11 +1,13 @@
 """SQS utilities and service exports for notifications."""
 from .sqs_client import SQSClient
 from .notification_queue import NotificationQueueService
+from .batch_sender import BatchingSender
 from .interfaces import QueueMessage, NotificationPayload
 
 __all__ = [
     'SQSClient',
     'NotificationQueueService', 
+    'BatchingSender',
     'QueueMessage',
     'NotificationPayload'
 ]
\ No newline at end of file
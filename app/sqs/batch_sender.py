@@ -0,0 +1,157 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from .sqs_client import SQSClient
+from .interfaces import QueueMessage
+from ..metrics import registry
+
+# Buffers outgoing queue messages and sends them with SendMessageBatch
+
+SQS_MAX_BATCH = 10
+# SendMessageBatch rejects requests whose bodies add up to more than 256 KiB
+SQS_MAX_BATCH_BYTES = 256 * 1024
+
+BATCH_SIZE = registry.histogram(
+    "sqs_send_batch_size", "Messages per SendMessageBatch call",
+    buckets=(1, 2, 3, 4, 5, 6, 7, 8, 9, 10)
+)
+BATCH_ENTRIES_FAILED = registry.counter("sqs_send_batch_failed_total", "Batch entries SQS did not accept, by error code")
+
+
+class BatchingSender:
+    # send() only appends to a buffer; a background thread flushes when `max_batch` messages are
+    # waiting or the oldest one has waited `flush_interval` seconds, whichever comes first
+    def __init__(self, sqs_client: SQSClient, queue_name: str, max_batch: int = None, flush_interval: float = None,
+                 max_attempts: int = None, on_failure: Optional[Callable[[QueueMessage], None]] = None):
+        self.sqs_client = sqs_client
+        self.queue_name = queue_name
+        self.max_batch = min(max_batch or int(os.getenv('SQS_SEND_BATCH_SIZE', '10')), SQS_MAX_BATCH)
+        self.flush_interval = flush_interval if flush_interval is not None else \
+            float(os.getenv('SQS_SEND_FLUSH_MS', '50')) / 1000
+        self.max_attempts = max_attempts or int(os.getenv('SQS_SEND_MAX_ATTEMPTS', '3'))
+        # called for entries that could not be delivered (sender fault or retries exhausted);
+        # its return value is the entry's final outcome
+        self.on_failure = on_failure
+
+        # (message, delay_seconds, attempt, first_buffered_at, on_done)
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self.stats = {"buffered": 0, "sent": 0, "batches": 0, "retried": 0, "failed": 0}
+
+    def send(self, message: QueueMessage, delay_seconds: int = 0,
+             on_done: Optional[Callable[[bool], None]] = None) -> bool:
+        # buffer a message for the next batch; False once the sender has been closed.
+        # on_done(delivered) is called once SQS accepted the message or it was given up
+        with self._cond:
+            if self._closed:
+                return False
+            self._buffer.append((message, delay_seconds, 1, time.monotonic(), on_done))
+            self.stats["buffered"] += 1
+            self._ensure_thread()
+            # the first message starts the flush window; a full batch ends it early
+            if len(self._buffer) == 1 or len(self._buffer) >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    def _ensure_thread(self):
+        # start the flusher lazily (caller holds the lock)
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=f"sqs-batch-{self.queue_name}", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> List[Tuple]:
+        # pop up to max_batch entries, stopping early if the payload would exceed the request size limit
+        batch = []
+        size = 0
+        while self._buffer and len(batch) < self.max_batch:
+            entry_size = len(self._buffer[0][0].model_dump_json())
+            if batch and size + entry_size > SQS_MAX_BATCH_BYTES:
+                break
+            batch.append(self._buffer.popleft())
+            size += entry_size
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer:
+                    return
+                # hold a partial batch until the oldest entry's flush window ends
+                while len(self._buffer) < self.max_batch and not self._closed:
+                    remaining = self._buffer[0][3] + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take_batch()
+            self._send_batch(batch)
+
+    def _send_batch(self, batch: List[Tuple]):
+        # one SendMessageBatch call; retryable entry failures go back to the front of the buffer
+        result = self.sqs_client.send_message_batch(self.queue_name, [(entry[0], entry[1]) for entry in batch])
+        BATCH_SIZE.observe(len(batch))
+        self.stats["batches"] += 1
+        self.stats["sent"] += len(result['successful'])
+
+        entries = {entry[0].id: entry for entry in batch}
+        for message_id in result['successful']:
+            self._done(entries[message_id][4], True)
+        retry = []
+        for failure in result['failed']:
+            BATCH_ENTRIES_FAILED.inc(labels={"code": failure['code'] or "unknown"})
+            message, delay, attempt, buffered_at, on_done = entries[failure['id']]
+            if not failure['sender_fault'] and attempt < self.max_attempts:
+                retry.append((message, delay, attempt + 1, buffered_at, on_done))
+            else:
+                self._done(on_done, self._give_up(message, failure['code']))
+
+        if retry:
+            self.stats["retried"] += len(retry)
+            # brief pause so a throttled queue isn't hit again immediately
+            time.sleep(min(0.1 * 2 ** (retry[0][2] - 1), 2))
+            with self._cond:
+                self._buffer.extendleft(reversed(retry))
+
+    def _give_up(self, message: QueueMessage, code: Optional[str]) -> bool:
+        self.stats["failed"] += 1
+        print(f"SQS batch send failed for message {message.id}: {code}")
+        if self.on_failure:
+            try:
+                return bool(self.on_failure(message))
+            except Exception as e:
+                print(f"Failure handler raised for message {message.id}: {e}")
+        return False
+
+    def _done(self, on_done: Optional[Callable[[bool], None]], delivered: bool):
+        if on_done:
+            try:
+                on_done(delivered)
+            except Exception as e:
+                print(f"Send completion callback raised: {e}")
+
+    def flush(self):
+        # send everything buffered right now on the calling thread
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._send_batch(batch)
+
+    def close(self, timeout: float = 10):
+        # stop accepting messages and let the flusher drain the buffer; whatever is left is sent inline
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "pending": len(self._buffer)}
@@ -2,11 +2,14 @@
 import os
 import json
 import uuid
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 from .sqs_client import SQSClient
+from .batch_sender import BatchingSender
+from ..aws_clients import get_client
 from .interfaces import QueueMessage, NotificationPayload
 
 ROOT_ENV = Path(__file__).resolve().parents[2] / ".env"
@@ -14,6 +17,17 @@ load_dotenv(dotenv_path=ROOT_ENV, override=True)
 
 # Notification queue service that enqueues and processes notification messages
 
+def priority_weights() -> Dict[str, int]:
+    # lanes and their relative share of receives, from SQS_PRIORITY_WEIGHTS="high=3,normal=1".
+    # only listed lanes get a queue and pollers; "normal" always exists and takes any other priority
+    weights = {}
+    for part in os.getenv('SQS_PRIORITY_WEIGHTS', 'high=3,normal=1').split(','):
+        lane, _, weight = part.partition('=')
+        if lane.strip() and weight.strip().isdigit():
+            weights[lane.strip()] = max(int(weight), 1)
+    weights.setdefault("normal", 1)
+    return weights
+
 
 class NotificationQueueService:
     # orchestrates enqueueing and processing of notification messages
@@ -23,14 +37,34 @@ class NotificationQueueService:
         
         # Queue names from environment variables
         self.notification_queue = os.getenv('AWS_SQS_QUEUE_NAME', 'notification-processing-queue')
+        # one queue per priority lane; "normal" keeps the configured name, others are <name>-<priority>
+        self.weights = priority_weights()
+        self.queues = {
+            priority: self.notification_queue if priority == "normal" else f"{self.notification_queue}-{priority}"
+            for priority in self.weights
+        }
         self.dlq_queue = os.getenv('AWS_SQS_DLQ_NAME', 'notification-dead-letter-queue')
+        # deliveries per message before SQS redrives it to the DLQ; failed attempts in between
+        # stay on the queue, hidden for the backoff delay
+        self.max_receive_count = int(os.getenv('SQS_MAX_RECEIVE_COUNT', '3'))
+        # topic name -> ARN, so list_topics runs once per topic instead of once per email
+        self._topic_arns = {}
+        # shared by every poller and lane: caps how many messages are delivered at once across the process
+        self.handler_concurrency = int(os.getenv('SQS_HANDLER_CONCURRENCY', '16'))
+        self._handlers = ThreadPoolExecutor(max_workers=self.handler_concurrency, thread_name_prefix="sqs-handler")
         
         # Initialize queues if enabled
         if self.enabled:
             self._ensure_queues_exist()
+        
+        # enqueues are coalesced into SendMessageBatch calls per lane; undeliverable ones fall back to SNS
+        self.senders = {
+            priority: BatchingSender(self.sqs_client, queue_name, on_failure=self._deliver_directly)
+            for priority, queue_name in self.queues.items()
+        }
     
     def _ensure_queues_exist(self):
-        # ensure the primary queue and DLQ are created
+        # ensure the DLQ and a queue per priority lane, all redriving to it, are created
         try:
             # Create dead letter queue first
             dlq_url = self.sqs_client.create_queue(
@@ -42,13 +76,15 @@ class NotificationQueueService:
             # Get DLQ ARN for main queue
             dlq_arn = self._get_queue_arn(self.dlq_queue)
             
-            # Create main notification queue with DLQ
-            self.sqs_client.create_queue(
-                queue_name=self.notification_queue,
-                dead_letter_queue_arn=dlq_arn,
-                visibility_timeout=30,
-                message_retention_period=1209600  # 14 days
-            )
+            # Create the lane queues with DLQ
+            for queue_name in self.queues.values():
+                self.sqs_client.create_queue(
+                    queue_name=queue_name,
+                    dead_letter_queue_arn=dlq_arn,
+                    visibility_timeout=30,
+                    message_retention_period=1209600,  # 14 days
+                    max_receive_count=self.max_receive_count
+                )
             
         except Exception as e:
             pass
@@ -60,11 +96,15 @@ class NotificationQueueService:
         except Exception:
             return None
     
-    def queue_notification(self, notification: NotificationPayload, 
-                          delay_seconds: int = 0, priority: str = "normal") -> bool:
-        # enqueue a notification payload to SQS, fallback to SNS if disabled
+    def queue_notification(self, notification: NotificationPayload, delay_seconds: int = 0, priority: str = "normal",
+                           on_done: Optional[Callable[[bool], None]] = None) -> bool:
+        # enqueue a notification payload to SQS, fallback to SNS if disabled. on_done(delivered), if given,
+        # is called exactly once with the final outcome: for a buffered message, only after SQS accepted it
         if not self.enabled:
-            return self._send_direct_notification(notification)
+            return self._report(on_done, self._send_direct_notification(notification))
+        
+        if priority not in self.queues:
+            priority = "normal"
         
         try:
             # Create queue message
@@ -81,30 +121,41 @@ class NotificationQueueService:
                 created_at=datetime.now()
             )
             
-            # Send to SQS
-            success = self.sqs_client.send_message(
-                queue_name=self.notification_queue,
+            # Buffer for the next SQS batch; after shutdown, send on the caller's thread
+            if self.senders[priority].send(message, delay_seconds, on_done):
+                return True
+            
+            return self._report(on_done, self.sqs_client.send_message(
+                queue_name=self.queues[priority],
                 message=message,
                 delay_seconds=delay_seconds
-            )
-            
-            return success
+            ))
             
         except Exception as e:
             # Fallback to direct notification if queuing fails
-            return self._send_direct_notification(notification)
+            return self._report(on_done, self._send_direct_notification(notification))
+    
+    def _report(self, on_done: Optional[Callable[[bool], None]], delivered: bool) -> bool:
+        # outcome of a message sent synchronously
+        if on_done:
+            on_done(delivered)
+        return delivered
+    
+    def _deliver_directly(self, message: QueueMessage) -> bool:
+        # fallback for a queued message that SQS would not accept
+        notification = NotificationPayload.model_validate(message.payload.get('notification', {}))
+        return self._send_direct_notification(notification)
+    
+    def close(self):
+        # flush buffered messages to SQS (called on application shutdown)
+        for sender in self.senders.values():
+            sender.close()
     
     def _send_direct_notification(self, notification: NotificationPayload) -> bool:
         # directly publish to SNS as a fallback delivery method
         try:
             # Send email via SNS directly
-            import boto3
-            import os
-            
-            sns_client = boto3.client('sns',
-                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                region_name=os.getenv('AWS_REGION', 'us-east-1'))
+            sns_client = get_client('sns', os.getenv('AWS_REGION', 'us-east-1'))
             
             topic_arn = os.getenv('AWS_SNS_TOPIC_ARN')
             
@@ -120,74 +171,81 @@ class NotificationQueueService:
         except Exception as e:
             return False
     
-    def process_queued_notifications(self, batch_size: int = 10) -> Dict[str, Any]:
-        # process messages from the notification queue in batches
+    def process_queued_notifications(self, batch_size: int = 10, wait_time: int = 5, tracker=None,
+                                     priority: str = "normal") -> Dict[str, Any]:
+        # process messages from one priority lane in batches; wait_time is the SQS long-poll wait.
+        # an optional tracker (the worker's VisibilityTracker) keeps received messages invisible until acked
         if not self.enabled:
             return {"status": "disabled", "processed": 0}
         
+        queue_name = self.queues[priority]
         try:
             # Receive messages from queue
             messages = self.sqs_client.receive_messages(
-                queue_name=self.notification_queue,
+                queue_name=queue_name,
                 max_messages=min(batch_size, 10),
-                wait_time=5  # Short polling for background processing
+                wait_time=wait_time
             )
             
             results = {
                 "status": "success",
+                "received": len(messages),
                 "processed": 0,
                 "successful": 0,
                 "failed": 0,
                 "retried": 0,
+                "ack_failed": 0,
+                "visibility_failed": 0,
                 "errors": []
             }
-            
-            for msg_data in messages:
-                message = msg_data['message']
-                receipt_handle = msg_data['receipt_handle']
+            handles = [msg_data['receipt_handle'] for msg_data in messages]
+            if tracker is not None:
+                tracker.track(queue_name, handles)
+            
+            try:
+                # handle messages concurrently on the shared pool; outcomes come back in receive order
+                if len(messages) > 1:
+                    outcomes = list(self._handlers.map(self._handle_message, messages))
+                else:
+                    outcomes = [self._handle_message(msg_data) for msg_data in messages]
+                
+                # receipt handles to delete, flushed with DeleteMessageBatch after the batch is handled,
+                # and (handle, seconds) for failed deliveries that stay on the queue until their retry
+                acks = []
+                hides = []
+                for msg_data, outcome in zip(messages, outcomes):
+                    results[outcome["result"]] += 1
+                    if not outcome["malformed"]:
+                        results["processed"] += 1
+                    if outcome["error"]:
+                        results["errors"].append(outcome["error"])
+                    if outcome["ack"]:
+                        acks.append(msg_data['receipt_handle'])
+                    elif outcome["visibility"] is not None:
+                        hides.append((msg_data['receipt_handle'], outcome["visibility"]))
                 
-                try:
-                    # Extract notification payload
-                    notification_data = message.payload.get('notification', {})
-                    notification = NotificationPayload.model_validate(notification_data)
-                    
-                    # Attempt to send notification
-                    success = self._send_email_notification(notification)
-                    
-                    if success:
-                        # Delete message on successful processing
-                        self.sqs_client.delete_message(self.notification_queue, receipt_handle)
-                        results["successful"] += 1
-                    else:
-                        # Handle retry logic
-                        if message.retry_count < message.max_retries:
-                            # Increment retry count and requeue with delay
-                            message.retry_count += 1
-                            message.error_message = "Email delivery failed, retrying"
-                            
-                            retry_delay = self._calculate_retry_delay(message.retry_count)
-                            
-                            # Delete original message and send new one with retry count
-                            self.sqs_client.delete_message(self.notification_queue, receipt_handle)
-                            self.sqs_client.send_message(
-                                queue_name=self.notification_queue,
-                                message=message,
-                                delay_seconds=retry_delay
-                            )
-                            
-                            results["retried"] += 1
-                        else:
-                            # Max retries exceeded, message will go to DLQ
-                            results["failed"] += 1
-                            results["errors"].append(f"Max retries exceeded for {notification.recipient_email}")
-                    
-                    results["processed"] += 1
-                    
-                except Exception as processing_error:
-                    # Delete malformed messages
-                    self.sqs_client.delete_message(self.notification_queue, receipt_handle)
-                    results["failed"] += 1
-                    results["errors"].append(f"Processing error: {str(processing_error)}")
+                if hides:
+                    # stop the heartbeat first (waiting out an extension in flight) so it can't
+                    # overwrite the backoff with a plain extension
+                    if tracker is not None:
+                        tracker.take(handle for handle, _ in hides)
+                    # a failed change just means the message is retried when its current visibility ends
+                    failed_hides = self.sqs_client.change_message_visibility_batch(queue_name, hides)['failed']
+                    results["visibility_failed"] = len(failed_hides)
+                    for failure in failed_hides:
+                        results["errors"].append(f"Visibility change failed: {failure['code']}")
+                
+                if acks:
+                    # undeleted messages simply become visible again after the visibility timeout
+                    failed_acks = self.sqs_client.delete_message_batch(queue_name, acks)['failed']
+                    results["ack_failed"] = len(failed_acks)
+                    for failure in failed_acks:
+                        results["errors"].append(f"Delete failed: {failure['code']}")
+            finally:
+                # acked (or failed) messages no longer need their visibility extended
+                if tracker is not None:
+                    for handle in handles:
+                        tracker.untrack(handle)
             
             return results
             
@@ -198,24 +256,46 @@ class NotificationQueueService:
                 "processed": 0
             }
     
+    def _handle_message(self, msg_data: Dict[str, Any]) -> Dict[str, Any]:
+        # deliver one received message; returns its result bucket, whether to delete it,
+        # the visibility timeout to leave it with if not (None to leave it as is), and any error
+        message = msg_data['message']
+        try:
+            # Extract notification payload
+            notification_data = message.payload.get('notification', {})
+            notification = NotificationPayload.model_validate(notification_data)
+            
+            # Attempt to send notification
+            if self._send_email_notification(notification):
+                # Delete message on successful processing
+                return {"result": "successful", "ack": True, "visibility": None, "malformed": False, "error": None}
+            
+            # Keep the message and hide it for the backoff delay; SQS counts the deliveries
+            receive_count = int(msg_data['raw_message'].get('Attributes', {}).get('ApproximateReceiveCount', 1))
+            if receive_count < self.max_receive_count:
+                return {"result": "retried", "ack": False, "visibility": self._calculate_retry_delay(receive_count),
+                        "malformed": False, "error": None}
+            
+            # Last delivery: make it visible now so the next receive redrives it to the DLQ
+            return {"result": "failed", "ack": False, "visibility": 0, "malformed": False,
+                    "error": f"Max retries exceeded for {notification.recipient_email}"}
+            
+        except Exception as processing_error:
+            # Delete malformed messages
+            return {"result": "failed", "ack": True, "visibility": None, "malformed": True,
+                    "error": f"Processing error: {str(processing_error)}"}
+    
     def _calculate_retry_delay(self, retry_count: int) -> int:
         # Exponential backoff: 30s, 2m, 8m
         base_delay = 30
-        return min(base_delay * (2 ** (retry_count - 1)), 480)  # Max 8 minutes
+        # 480s is well under SQS's 12 hour visibility ceiling
+        return min(base_delay * (4 ** (retry_count - 1)), 480)  # Max 8 minutes
     
     def _send_email_notification(self, notification: NotificationPayload) -> bool:
         # send the notification message via SNS topic
         try:
-            # Import here to avoid circular imports
-            import boto3
-            
             # Use SNS directly for email delivery
-            sns_client = boto3.client(
-                'sns',
-                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                region_name=os.getenv('AWS_SNS_REGION', 'us-east-1')
-            )
+            sns_client = get_client('sns', os.getenv('AWS_SNS_REGION', 'us-east-1'))
             
             # Get the notification topic name from environment
             topic_name = os.getenv('AWS_SNS_TOPIC_NAME', 'product-notifications')
@@ -244,20 +324,16 @@ class NotificationQueueService:
     
     def _get_sns_topic_arn(self, topic_name: str) -> Optional[str]:
         # lookup an SNS topic ARN by name
+        if topic_name in self._topic_arns:
+            return self._topic_arns[topic_name]
         try:
-            import boto3
-            
-            sns_client = boto3.client(
-                'sns',
-                aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-                aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                region_name=os.getenv('AWS_SNS_REGION', 'us-east-1')
-            )
+            sns_client = get_client('sns', os.getenv('AWS_SNS_REGION', 'us-east-1'))
             
             response = sns_client.list_topics()
             for topic in response.get('Topics', []):
                 arn = topic['TopicArn']
                 if arn.endswith(f":{topic_name}"):
+                    self._topic_arns[topic_name] = arn
                     return arn
             
             return None
@@ -266,19 +342,28 @@ class NotificationQueueService:
             return None
     
     def get_queue_stats(self) -> Dict[str, Any]:
-        # return queue status and DLQ/main queue stats
+        # return queue status and DLQ/per-lane queue stats
         if not self.enabled:
             return {"status": "disabled"}
         
         try:
-            main_stats = self.sqs_client.get_queue_stats(self.notification_queue)
+            lane_stats = {priority: self.sqs_client.get_queue_stats(queue_name)
+                          for priority, queue_name in self.queues.items()}
             dlq_stats = self.sqs_client.get_queue_stats(self.dlq_queue)
             
             return {
                 "status": "enabled",
-                "notification_queue": main_stats.model_dump() if main_stats else None,
+                "notification_queue": lane_stats["normal"].model_dump() if lane_stats["normal"] else None,
+                "lanes": {
+                    priority: {
+                        "queue": stats.model_dump() if stats else None,
+                        "weight": self.weights[priority],
+                        "sender": self.senders[priority].get_stats()
+                    }
+                    for priority, stats in lane_stats.items()
+                },
                 "dead_letter_queue": dlq_stats.model_dump() if dlq_stats else None,
-                "total_pending": main_stats.visible_messages if main_stats else 0,
+                "total_pending": sum(stats.visible_messages for stats in lane_stats.values() if stats),
                 "total_failed": dlq_stats.visible_messages if dlq_stats else 0
             }
             
@@ -289,7 +374,7 @@ class NotificationQueueService:
             }
     
     def requeue_failed_messages(self, max_messages: int = 10) -> Dict[str, Any]:
-        # move messages from DLQ back to the main queue for reprocessing
+        # move messages from DLQ back to their priority lane for reprocessing
         if not self.enabled:
             return {"status": "disabled", "requeued": 0}
         
@@ -301,29 +386,23 @@ class NotificationQueueService:
                 wait_time=5
             )
             
-            requeued = 0
-            
+            # Reset retry counts, resend in one batch per lane, then delete what was accepted from the DLQ
+            lanes = {}
             for msg_data in dlq_messages:
-                try:
-                    message = msg_data['message']
-                    receipt_handle = msg_data['receipt_handle']
-                    
-                    # Reset retry count and requeue
-                    message.retry_count = 0
-                    message.error_message = "Requeued from DLQ"
-                    
-                    success = self.sqs_client.send_message(
-                        queue_name=self.notification_queue,
-                        message=message
-                    )
-                    
-                    if success:
-                        # Delete from DLQ after successful requeue
-                        self.sqs_client.delete_message(self.dlq_queue, receipt_handle)
-                        requeued += 1
-                
-                except Exception:
-                    continue
+                message = msg_data['message']
+                message.retry_count = 0
+                message.error_message = "Requeued from DLQ"
+                priority = message.payload.get('priority', 'normal')
+                lanes.setdefault(self.queues.get(priority, self.notification_queue), {})[message.id] = \
+                    (message, msg_data['receipt_handle'])
+            
+            requeued = 0
+            for queue_name, handles in lanes.items():
+                sent = self.sqs_client.send_message_batch(
+                    queue_name, [(message, 0) for message, _ in handles.values()]
+                )['successful']
+                self.sqs_client.delete_message_batch(self.dlq_queue, [handles[message_id][1] for message_id in sent])
+                requeued += len(sent)
             
             return {
                 "status": "success",
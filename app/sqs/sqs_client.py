@@ -1,13 +1,13 @@
 import os
 import json
 import uuid
-import boto3
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from botocore.exceptions import ClientError
 from pathlib import Path
 from dotenv import load_dotenv
 from .interfaces import QueueMessage, QueueStats
+from ..aws_clients import get_client
 
 ROOT_ENV = Path(__file__).resolve().parents[2] / ".env"
 load_dotenv(dotenv_path=ROOT_ENV, override=True)
@@ -19,12 +19,7 @@ class SQSClient:
     # SQS client for send/receive/delete and queue management
     def __init__(self):
         # initialize boto3 SQS client and cache
-        self.sqs_client = boto3.client(
-            'sqs',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_SQS_REGION', 'us-east-1')
-        )
+        self.sqs_client = get_client('sqs', os.getenv('AWS_SQS_REGION', 'us-east-1'))
         
         self.region = os.getenv('AWS_SQS_REGION', 'us-east-1')
         self.account_id = self._get_account_id()
@@ -35,7 +30,7 @@ class SQSClient:
     def _get_account_id(self) -> str:
         """Get AWS account ID"""
         try:
-            sts = boto3.client('sts')
+            sts = get_client('sts')
             return sts.get_caller_identity()['Account']
         except Exception:
             return "unknown"
@@ -55,8 +50,10 @@ class SQSClient:
             raise e
     
     def create_queue(self, queue_name: str, dead_letter_queue_arn: Optional[str] = None, 
-                     visibility_timeout: int = 30, message_retention_period: int = 1209600) -> str:
-        # create a new SQS queue (idempotent) and return its URL
+                     visibility_timeout: int = 30, message_retention_period: int = 1209600,
+                     max_receive_count: int = 3) -> str:
+        # create a new SQS queue (idempotent) and return its URL; with a DLQ, messages move there
+        # on the receive after their max_receive_count-th
         try:
             existing_url = self._get_queue_url(queue_name)
             if existing_url:
@@ -72,7 +69,7 @@ class SQSClient:
             if dead_letter_queue_arn:
                 attributes['RedrivePolicy'] = json.dumps({
                     'deadLetterTargetArn': dead_letter_queue_arn,
-                    'maxReceiveCount': 3
+                    'maxReceiveCount': max_receive_count
                 })
             
             response = self.sqs_client.create_queue(
@@ -102,16 +99,7 @@ class SQSClient:
                 QueueUrl=queue_url,
                 MessageBody=message_body,
                 DelaySeconds=delay_seconds,
-                MessageAttributes={
-                    'message_type': {
-                        'StringValue': message.message_type,
-                        'DataType': 'String'
-                    },
-                    'retry_count': {
-                        'StringValue': str(message.retry_count),
-                        'DataType': 'Number'
-                    }
-                }
+                MessageAttributes=self._message_attributes(message)
             )
             
             return True
@@ -121,6 +109,56 @@ class SQSClient:
         except Exception as e:
             return False
     
+    def _message_attributes(self, message: QueueMessage) -> Dict[str, Any]:
+        return {
+            'message_type': {
+                'StringValue': message.message_type,
+                'DataType': 'String'
+            },
+            'retry_count': {
+                'StringValue': str(message.retry_count),
+                'DataType': 'Number'
+            }
+        }
+    
+    def send_message_batch(self, queue_name: str, entries: List[Tuple[QueueMessage, int]]) -> Dict[str, List[Dict[str, Any]]]:
+        # send up to 10 (message, delay_seconds) pairs in one SendMessageBatch call.
+        # returns the message ids that were accepted and the per-entry failures
+        # ({'id', 'code', 'sender_fault'}); a failed call fails every entry as retryable
+        ids = [message.id for message, _ in entries]
+        try:
+            queue_url = self._get_queue_url(queue_name)
+            if not queue_url:
+                return {'successful': [], 'failed': [
+                    {'id': message_id, 'code': 'QueueDoesNotExist', 'sender_fault': True} for message_id in ids
+                ]}
+            
+            response = self.sqs_client.send_message_batch(
+                QueueUrl=queue_url,
+                Entries=[{
+                    'Id': message.id,
+                    'MessageBody': message.model_dump_json(),
+                    'DelaySeconds': delay_seconds,
+                    'MessageAttributes': self._message_attributes(message)
+                } for message, delay_seconds in entries]
+            )
+            
+            return {
+                'successful': [entry['Id'] for entry in response.get('Successful', [])],
+                'failed': [
+                    {'id': entry['Id'], 'code': entry.get('Code'), 'sender_fault': entry.get('SenderFault', False)}
+                    for entry in response.get('Failed', [])
+                ]
+            }
+            
+        except ClientError as e:
+            code = e.response['Error']['Code']
+        except Exception as e:
+            code = type(e).__name__
+        return {'successful': [], 'failed': [
+            {'id': message_id, 'code': code, 'sender_fault': False} for message_id in ids
+        ]}
+    
     def receive_messages(self, queue_name: str, max_messages: int = 1, 
                         wait_time: int = 20) -> List[Dict[str, Any]]:
         # receive messages from a queue and return parsed QueueMessage entries
@@ -181,6 +219,71 @@ class SQSClient:
         except Exception as e:
             return False
     
+    def delete_message_batch(self, queue_name: str, receipt_handles: List[str],
+                             max_attempts: int = 3) -> Dict[str, List[Dict[str, Any]]]:
+        # delete processed messages 10 per DeleteMessageBatch call; entries that fail for
+        # non-sender reasons are retried. returns the receipt handles that could not be deleted
+        failed = []
+        try:
+            queue_url = self._get_queue_url(queue_name)
+        except Exception:
+            queue_url = None
+        if not queue_url:
+            return {'failed': [{'receipt_handle': handle, 'code': 'QueueDoesNotExist'} for handle in receipt_handles]}
+        
+        for start in range(0, len(receipt_handles), 10):
+            pending = {str(i): handle for i, handle in enumerate(receipt_handles[start:start + 10])}
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    response = self.sqs_client.delete_message_batch(
+                        QueueUrl=queue_url,
+                        Entries=[{'Id': entry_id, 'ReceiptHandle': handle} for entry_id, handle in pending.items()]
+                    )
+                except Exception as e:
+                    code = e.response['Error']['Code'] if isinstance(e, ClientError) else type(e).__name__
+                    response = {'Failed': [{'Id': entry_id, 'Code': code, 'SenderFault': False} for entry_id in pending]}
+                
+                retry = {}
+                for entry in response.get('Failed', []):
+                    if entry.get('SenderFault') or attempt == max_attempts:
+                        failed.append({'receipt_handle': pending[entry['Id']], 'code': entry.get('Code')})
+                    else:
+                        retry[entry['Id']] = pending[entry['Id']]
+                if not retry:
+                    break
+                pending = retry
+        
+        return {'failed': failed}
+    
+    def change_message_visibility_batch(self, queue_name: str,
+                                        entries: List[Tuple[str, int]]) -> Dict[str, List[Dict[str, Any]]]:
+        # set the visibility timeout of (receipt_handle, seconds) pairs, 10 per call.
+        # returns the receipt handles whose visibility could not be changed
+        failed = []
+        try:
+            queue_url = self._get_queue_url(queue_name)
+        except Exception:
+            queue_url = None
+        if not queue_url:
+            return {'failed': [{'receipt_handle': handle, 'code': 'QueueDoesNotExist'} for handle, _ in entries]}
+        
+        for start in range(0, len(entries), 10):
+            chunk = {str(i): entry for i, entry in enumerate(entries[start:start + 10])}
+            try:
+                response = self.sqs_client.change_message_visibility_batch(
+                    QueueUrl=queue_url,
+                    Entries=[{'Id': entry_id, 'ReceiptHandle': handle, 'VisibilityTimeout': timeout}
+                             for entry_id, (handle, timeout) in chunk.items()]
+                )
+            except Exception as e:
+                code = e.response['Error']['Code'] if isinstance(e, ClientError) else type(e).__name__
+                response = {'Failed': [{'Id': entry_id, 'Code': code} for entry_id in chunk]}
+            
+            failed.extend({'receipt_handle': chunk[entry['Id']][0], 'code': entry.get('Code')}
+                          for entry in response.get('Failed', []))
+        
+        return {'failed': failed}
+    
     def get_queue_stats(self, queue_name: str) -> Optional[QueueStats]:
         # fetch approximate queue statistics
         try:
@@ -1,17 +1,135 @@
+import os
+import time
 import asyncio
 import signal
 import sys
-from typing import Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Tuple
 from datetime import datetime
 from .notification_queue import NotificationQueueService
+from ..metrics import registry
+
+VISIBILITY_EXTENSIONS = registry.counter(
+    "sqs_visibility_extensions_total", "Messages whose visibility timeout was extended while still being processed"
+)
+VISIBILITY_EXTENSION_FAILURES = registry.counter(
+    "sqs_visibility_extension_failures_total", "Visibility extensions SQS rejected"
+)
+
+
+class VisibilityTracker:
+    # receipt handles currently being processed, with the time their visibility runs out
+    def __init__(self, visibility_timeout: int):
+        self.visibility_timeout = visibility_timeout
+        self._deadlines = {}
+        # handles with a heartbeat extension in flight
+        self._extending = set()
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    def track(self, queue_name: str, receipt_handles: Iterable[str]):
+        deadline = time.monotonic() + self.visibility_timeout
+        with self._lock:
+            for handle in receipt_handles:
+                self._deadlines[handle] = (queue_name, deadline)
+
+    def untrack(self, receipt_handle: str):
+        with self._lock:
+            self._deadlines.pop(receipt_handle, None)
+
+    def take(self, receipt_handles: Iterable[str], timeout: float = 30):
+        # untrack handles and wait out any extension already in flight for them, so a visibility
+        # change the caller makes next (e.g. a retry backoff) can't be overwritten by the heartbeat
+        receipt_handles = set(receipt_handles)
+        with self._lock:
+            for handle in receipt_handles:
+                self._deadlines.pop(handle, None)
+            self._released.wait_for(lambda: not (receipt_handles & self._extending), timeout)
+
+    def claim_due(self, margin: float) -> Dict[str, List[str]]:
+        # handles per queue whose visibility ends within `margin` seconds, marked as being extended
+        # until release(); untracked handles are never claimed
+        cutoff = time.monotonic() + margin
+        due = {}
+        with self._lock:
+            for handle, (queue_name, deadline) in self._deadlines.items():
+                if deadline <= cutoff:
+                    due.setdefault(queue_name, []).append(handle)
+                    self._extending.add(handle)
+        return due
+
+    def release(self, receipt_handles: Iterable[str]):
+        with self._lock:
+            self._extending.difference_update(receipt_handles)
+            self._released.notify_all()
+
+    def extended(self, receipt_handles: Iterable[str], seconds: int):
+        # record new deadlines, skipping handles that finished while the extension was in flight
+        deadline = time.monotonic() + seconds
+        with self._lock:
+            for handle in receipt_handles:
+                if handle in self._deadlines:
+                    self._deadlines[handle] = (self._deadlines[handle][0], deadline)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+
+class LaneScheduler:
+    # smooth weighted round-robin over the priority lanes for a shared set of pollers. while any lane
+    # has work, lanes are short-polled and one that comes back empty is skipped for `idle_recheck`
+    # seconds, so its turns go to busy lanes; once every lane is empty they are long-polled in turn
+    def __init__(self, weights: Dict[str, int], idle_recheck: float):
+        self.weights = weights
+        self.idle_recheck = idle_recheck
+        self._current = {lane: 0 for lane in weights}
+        self._idle_until = {lane: 0.0 for lane in weights}
+        self._busy = set()
+
+    def next_lane(self) -> Tuple[str, bool]:
+        # the lane to receive from next, and whether to long-poll it
+        long_poll = not self._busy
+        now = time.monotonic()
+        candidates = [lane for lane in self.weights if long_poll or self._idle_until[lane] <= now]
+        total = sum(self.weights[lane] for lane in candidates)
+        for lane in candidates:
+            self._current[lane] += self.weights[lane]
+        lane = max(candidates, key=self._current.get)
+        self._current[lane] -= total
+        return lane, long_poll
+
+    def report(self, lane: str, received: int):
+        if received:
+            self._busy.add(lane)
+            self._idle_until[lane] = 0.0
+        else:
+            self._busy.discard(lane)
+            self._idle_until[lane] = time.monotonic() + self.idle_recheck
 
 
 class NotificationWorker:
-    # Background worker that polls the notification queue and processes messages
-    def __init__(self, batch_size: int = 5, polling_interval: int = 10):
+    # Background worker whose concurrent pollers share the priority lanes by weight
+    def __init__(self, batch_size: int = 5, polling_interval: int = 10, pollers: int = None, wait_time: int = None):
         self.notification_service = NotificationQueueService()
         self.batch_size = batch_size
+        # idle back-off after an empty receive; a non-empty receive polls again immediately
         self.polling_interval = polling_interval
+        self.pollers = pollers or int(os.getenv('SQS_WORKER_POLLERS', '4'))
+        # every poller takes its next lane from the scheduler: busy lanes split receives by weight
+        # and an empty lane's turns go to the others; it is checked again after SQS_LANE_IDLE_RECHECK
+        self.scheduler = LaneScheduler(self.notification_service.weights,
+                                       float(os.getenv('SQS_LANE_IDLE_RECHECK', '1')))
+        # long-poll wait per receive; the queues are created with a 20s ReceiveMessageWaitTimeSeconds
+        self.wait_time = wait_time if wait_time is not None else int(os.getenv('SQS_WORKER_WAIT_TIME', '20'))
+        self.max_error_backoff = 60
+        # keep in-progress messages invisible: every heartbeat_interval, extend any whose
+        # visibility (SQS_VISIBILITY_TIMEOUT, the queue's setting) ends within two intervals
+        self.visibility_timeout = int(os.getenv('SQS_VISIBILITY_TIMEOUT', '30'))
+        self.heartbeat_interval = float(os.getenv('SQS_HEARTBEAT_INTERVAL', '5'))
+        self.tracker = VisibilityTracker(self.visibility_timeout)
+        # one thread per poller, kept for the worker's lifetime
+        self._executor = None
         self.running = False
         self.stats = {
             "start_time": None,
@@ -19,41 +137,94 @@ class NotificationWorker:
             "total_successful": 0,
             "total_failed": 0,
             "total_retried": 0,
+            "empty_receives": 0,
+            "visibility_extensions": 0,
+            "processed_by_lane": {},
             "last_batch_time": None,
             "last_batch_size": 0
         }
     
-    async def start(self):
-        # start the polling loop for processing queued notifications
+    async def start(self, install_signal_handlers: bool = False):
+        # start `pollers` concurrent long-poll loops for processing queued notifications.
+        # signal handlers are for the standalone worker only: inside the app they would replace
+        # uvicorn's, and its shutdown hook (which stops this worker and flushes the outbox) would never run
         if not self.notification_service.enabled:
             return
         
         self.running = True
         self.stats["start_time"] = datetime.now()
+        self._executor = ThreadPoolExecutor(max_workers=self.pollers, thread_name_prefix="sqs-poller")
         
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        if install_signal_handlers:
+            signal.signal(signal.SIGINT, self._signal_handler)
+            signal.signal(signal.SIGTERM, self._signal_handler)
         
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
         try:
-            while self.running:
-                await self._process_batch()
-                await asyncio.sleep(self.polling_interval)
+            await asyncio.gather(*(self._poll_loop() for _ in range(self.pollers)))
                 
         except Exception as e:
             pass
         finally:
+            heartbeat.cancel()
             await self._shutdown()
     
-    async def _process_batch(self):
-        # process a single batch of queued notifications using a thread pool
+    async def _heartbeat_loop(self):
+        # extend visibility of messages still being processed so SQS doesn't hand them to another poller
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            for queue_name, handles in self.tracker.claim_due(self.heartbeat_interval * 2).items():
+                try:
+                    # default executor: the poller pool is busy with long polls
+                    result = await asyncio.to_thread(
+                        self.notification_service.sqs_client.change_message_visibility_batch,
+                        queue_name, [(handle, self.visibility_timeout) for handle in handles]
+                    )
+                except Exception as e:
+                    print(f"Visibility heartbeat failed: {e}")
+                    continue
+                finally:
+                    self.tracker.release(handles)
+                failed = {failure['receipt_handle'] for failure in result['failed']}
+                extended = [handle for handle in handles if handle not in failed]
+                self.tracker.extended(extended, self.visibility_timeout)
+                VISIBILITY_EXTENSIONS.inc(len(extended))
+                VISIBILITY_EXTENSION_FAILURES.inc(len(failed))
+                self.stats["visibility_extensions"] += len(extended)
+    
+    async def _poll_loop(self):
+        # receive and process batches back to back while any lane has work; back off only when all are idle or failing
+        errors = 0
+        while self.running:
+            priority, long_poll = self.scheduler.next_lane()
+            results = await self._process_batch(priority, self.wait_time if long_poll else 0)
+            if results is None:
+                errors += 1
+                await asyncio.sleep(min(max(self.polling_interval, 1) * 2 ** (errors - 1), self.max_error_backoff))
+                continue
+            
+            errors = 0
+            self.scheduler.report(priority, results.get("received", 0))
+            if results.get("received", 0) == 0:
+                self.stats["empty_receives"] += 1
+                if long_poll:
+                    await asyncio.sleep(self.polling_interval)
+    
+    async def _process_batch(self, priority: str = "normal", wait_time: int = None):
+        # process a single batch from a lane on the poller pool; None on failure
         try:
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(
-                    self.notification_service.process_queued_notifications,
-                    self.batch_size
-                )
-                results = future.result(timeout=30)
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(
+                self._executor,
+                self.notification_service.process_queued_notifications,
+                self.batch_size,
+                self.wait_time if wait_time is None else wait_time,
+                self.tracker,
+                priority
+            )
+            if results.get("status") == "error":
+                self.stats["total_failed"] += 1
+                return None
             
             self.stats["last_batch_time"] = datetime.now()
             self.stats["last_batch_size"] = results.get("processed", 0)
@@ -61,17 +232,23 @@ class NotificationWorker:
             self.stats["total_successful"] += results.get("successful", 0)
             self.stats["total_failed"] += results.get("failed", 0)
             self.stats["total_retried"] += results.get("retried", 0)
+            self.stats["processed_by_lane"][priority] = \
+                self.stats["processed_by_lane"].get(priority, 0) + results.get("processed", 0)
+            return results
             
         except Exception as e:
             self.stats["total_failed"] += 1
+            return None
     
     def _signal_handler(self, signum, frame):
         # signal handler to stop the loop gracefully
         self.running = False
     
     async def _shutdown(self):
-        # perform shutdown tasks for the worker
+        # perform shutdown tasks for the worker; in-flight long polls finish on their own
         self.running = False
+        if self._executor:
+            self._executor.shutdown(wait=False)
     
     def get_stats(self) -> Dict[str, Any]:
         # return runtime statistics for the worker
@@ -85,6 +262,13 @@ class NotificationWorker:
             "runtime_seconds": runtime.total_seconds() if runtime else None,
             "batch_size": self.batch_size,
             "polling_interval": self.polling_interval,
+            "pollers": self.pollers,
+            "lane_weights": self.scheduler.weights,
+            "processed_by_lane": self.stats["processed_by_lane"],
+            "wait_time": self.wait_time,
+            "empty_receives": self.stats["empty_receives"],
+            "visibility_extensions": self.stats["visibility_extensions"],
+            "in_progress": len(self.tracker),
             "total_processed": self.stats["total_processed"],
             "total_successful": self.stats["total_successful"],
             "total_failed": self.stats["total_failed"],
@@ -126,15 +310,13 @@ def stop_background_worker():
 
 
 async def main():
-    import os
-    
     batch_size = int(os.getenv('SQS_WORKER_BATCH_SIZE', '5'))
     polling_interval = int(os.getenv('SQS_WORKER_POLLING_INTERVAL', '10'))
     
     worker = NotificationWorker(batch_size, polling_interval)
     
     try:
-        await worker.start()
+        await worker.start(install_signal_handlers=True)
     except KeyboardInterrupt:
         pass
 
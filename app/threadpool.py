@@ -0,0 +1,62 @@
+import os
+import time
+import inspect
+import functools
+from anyio import to_thread
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from .metrics import registry
+
+# Sizing and observability for the AnyIO threadpool that runs sync route handlers
+
+THREADPOOL_WAIT = registry.histogram(
+    "threadpool_queue_wait_seconds",
+    "Time a sync endpoint waited for a threadpool thread before it started running "
+    "(sync dependencies such as get_current_user are dispatched separately and not included)"
+)
+
+
+def _limiter_stat(name: str) -> float:
+    # read a statistic of the default limiter; only valid from inside the event loop
+    limiter = to_thread.current_default_thread_limiter()
+    if name == "capacity":
+        return limiter.total_tokens
+    if name == "in_use":
+        return limiter.borrowed_tokens
+    return limiter.statistics().tasks_waiting
+
+
+registry.gauge("threadpool_capacity", "Configured threadpool tokens", lambda: _limiter_stat("capacity"))
+registry.gauge("threadpool_in_use", "Threadpool tokens currently borrowed", lambda: _limiter_stat("in_use"))
+registry.gauge("threadpool_waiting", "Tasks queued waiting for a threadpool token", lambda: _limiter_stat("waiting"))
+
+
+def configure_threadpool():
+    # apply THREADPOOL_MAX_WORKERS to the default limiter; must run inside the event loop
+    limiter = to_thread.current_default_thread_limiter()
+    limiter.total_tokens = int(os.getenv('THREADPOOL_MAX_WORKERS', str(limiter.total_tokens)))
+    return limiter.total_tokens
+
+
+def _timed_dispatch(endpoint):
+    # async stand-in for a sync endpoint: performs the one threadpool dispatch FastAPI would have made,
+    # observing the gap between dispatch and the endpoint starting on its thread
+    @functools.wraps(endpoint)
+    async def dispatch(*args, **kwargs):
+        enqueued_at = time.perf_counter()
+
+        def run():
+            THREADPOOL_WAIT.observe(time.perf_counter() - enqueued_at)
+            return endpoint(*args, **kwargs)
+
+        return await run_in_threadpool(run)
+    return dispatch
+
+
+class ThreadpoolTimedRoute(APIRoute):
+    # route class for routers with sync endpoints; functools.wraps keeps the original signature,
+    # so parameters and dependencies resolve exactly as before
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not inspect.iscoroutinefunction(endpoint) and not inspect.isgeneratorfunction(endpoint):
+            endpoint = _timed_dispatch(endpoint)
+        super().__init__(path, endpoint, **kwargs)
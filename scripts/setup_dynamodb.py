@@ -47,9 +47,36 @@ def setup_dynamodb():
         except Exception as e:
             print(f"Error: {e}"); return False
 
+def setup_manifest_table():
+    print("="*70 + "\nDYNAMODB SETUP - Creating Upload Manifest Table\n" + "="*70)
+    dynamodb = boto3.client('dynamodb', aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'), region_name=os.getenv('AWS_REGION', 'us-east-1'))
+    
+    table_name = os.getenv('AWS_DYNAMODB_MANIFEST_TABLE', 'inventory-file-manifest').strip("'")
+    try:
+        resp = dynamodb.describe_table(TableName=table_name)
+        print(f"\nTable already exists: {table_name} ({resp['Table']['TableStatus']})")
+        set_key(env_path, 'AWS_DYNAMODB_MANIFEST_TABLE', table_name)
+        return True
+    except dynamodb.exceptions.ResourceNotFoundException:
+        print(f"\n[1/1] Creating Table: {table_name}\n" + "-"*70)
+        try:
+            # file_key is the item key; the GSIs serve uploader and upload-month listings, newest first
+            dynamodb.create_table(TableName=table_name, KeySchema=[{'AttributeName':'file_key','KeyType':'HASH'}],
+                AttributeDefinitions=[{'AttributeName':'file_key','AttributeType':'S'},{'AttributeName':'uploaded_by','AttributeType':'S'},
+                    {'AttributeName':'upload_month','AttributeType':'S'},{'AttributeName':'uploaded_at','AttributeType':'S'}],
+                GlobalSecondaryIndexes=[{'IndexName':'uploaded_by-index','KeySchema':[{'AttributeName':'uploaded_by','KeyType':'HASH'},{'AttributeName':'uploaded_at','KeyType':'RANGE'}],'Projection':{'ProjectionType':'ALL'}},
+                    {'IndexName':'upload_month-index','KeySchema':[{'AttributeName':'upload_month','KeyType':'HASH'},{'AttributeName':'uploaded_at','KeyType':'RANGE'}],'Projection':{'ProjectionType':'ALL'}}], BillingMode='PAY_PER_REQUEST')
+            print(f"Table created: {table_name}")
+            dynamodb.get_waiter('table_exists').wait(TableName=table_name)
+            set_key(env_path, 'AWS_DYNAMODB_MANIFEST_TABLE', table_name)
+            return True
+        except Exception as e:
+            print(f"Error: {e}"); return False
+
 if __name__ == "__main__":
     print("\nStarting DynamoDB Setup...\n")
-    if setup_dynamodb():
+    if setup_dynamodb() and setup_manifest_table():
         print("\n" + "="*70 + "\nDYNAMODB SETUP COMPLETE!\n" + "="*70 + "\n")
     else:
         print("\nSETUP FAILED\n"); exit(1)
@@ -0,0 +1,95 @@
+import threading
+import time
+from datetime import datetime
+
+from app.sqs.batch_sender import BatchingSender
+from app.sqs.interfaces import QueueMessage
+
+
+class FakeSQSClient:
+    def __init__(self, fail_codes=None):
+        self.batches = []
+        self.sent = threading.Event()
+        # message id -> (code, sender_fault) for entries to reject once
+        self.fail_codes = dict(fail_codes or {})
+
+    def send_message_batch(self, queue_name, entries):
+        self.batches.append([message.id for message, _ in entries])
+        failed = []
+        for message, _ in entries:
+            if message.id in self.fail_codes:
+                code, sender_fault = self.fail_codes.pop(message.id)
+                failed.append({'id': message.id, 'code': code, 'sender_fault': sender_fault})
+        failed_ids = {failure['id'] for failure in failed}
+        self.sent.set()
+        return {'successful': [message.id for message, _ in entries if message.id not in failed_ids], 'failed': failed}
+
+
+def make_message(message_id):
+    return QueueMessage(id=message_id, message_type="email_notification", payload={}, created_at=datetime.now())
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_lone_message_is_sent_within_flush_interval():
+    client = FakeSQSClient()
+    sender = BatchingSender(client, "queue", max_batch=10, flush_interval=0.05)
+    sender.send(make_message("first"))
+    assert wait_for(lambda: client.batches == [["first"]])
+
+    # the flusher is now idle: a later partial batch must still go out after its window
+    started = time.monotonic()
+    sender.send(make_message("second"))
+    assert wait_for(lambda: len(client.batches) == 2, timeout=0.5)
+    assert client.batches[1] == ["second"]
+    assert time.monotonic() - started < 0.5
+    assert sender.get_stats()["pending"] == 0
+    sender.close()
+
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    client = FakeSQSClient()
+    sender = BatchingSender(client, "queue", max_batch=3, flush_interval=10)
+    for i in range(3):
+        sender.send(make_message(str(i)))
+    assert wait_for(lambda: client.batches == [["0", "1", "2"]], timeout=1)
+    sender.close()
+
+
+def test_retryable_failures_are_resent_and_sender_faults_given_up():
+    client = FakeSQSClient(fail_codes={"a": ("ThrottlingException", False), "b": ("InvalidMessageContents", True)})
+    given_up = []
+    sender = BatchingSender(client, "queue", max_batch=10, flush_interval=0.01, on_failure=given_up.append)
+    sender.send(make_message("a"))
+    sender.send(make_message("b"))
+    sender.close()
+    assert [message.id for message in given_up] == ["b"]
+    assert sum(batch.count("a") for batch in client.batches) == 2
+    assert sender.get_stats()["sent"] == 1
+
+
+def test_close_flushes_and_rejects_new_messages():
+    client = FakeSQSClient()
+    sender = BatchingSender(client, "queue", max_batch=10, flush_interval=10)
+    sender.send(make_message("x"))
+    sender.close(timeout=0.1)
+    assert client.batches == [["x"]]
+    assert sender.send(make_message("y")) is False
+
+
+def test_on_done_reports_only_after_sqs_answers():
+    client = FakeSQSClient(fail_codes={"a": ("ThrottlingException", False), "b": ("InvalidMessageContents", True)})
+    outcomes = {}
+    sender = BatchingSender(client, "queue", max_batch=10, flush_interval=10, on_failure=lambda message: False)
+    for message_id in ("a", "b", "c"):
+        sender.send(make_message(message_id), on_done=lambda delivered, message_id=message_id: outcomes.setdefault(message_id, delivered))
+    assert outcomes == {}
+    sender.close()
+    assert outcomes == {"a": True, "b": False, "c": True}
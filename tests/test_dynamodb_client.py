@@ -0,0 +1,34 @@
+import os
+
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+os.environ.setdefault('AWS_REGION', 'us-east-1')
+
+from botocore.stub import Stubber
+
+from app.dynamodb_client import DynamoDBClient
+
+
+def test_parallel_scan_returns_plain_items():
+    db = DynamoDBClient()
+    client = db.dynamodb.meta.client
+    table_name = db.inventory_products.name
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            'scan',
+            {'Items': [{'id': {'S': 'p1'}, 'price': {'N': '9.5'}, 'quantity': {'N': '3'}}],
+             'LastEvaluatedKey': {'id': {'S': 'p1'}}},
+            {'TableName': table_name, 'Segment': 0, 'TotalSegments': 1, 'Limit': 1000}
+        )
+        stubber.add_response(
+            'scan',
+            {'Items': [{'id': {'S': 'p2'}, 'tags': {'L': [{'S': 'a'}]}}]},
+            {'TableName': table_name, 'Segment': 0, 'TotalSegments': 1, 'Limit': 1000,
+             'ExclusiveStartKey': {'id': 'p1'}}
+        )
+        items = list(db.parallel_scan(total_segments=1))
+
+    assert items == [
+        {'id': 'p1', 'price': 9.5, 'quantity': 3},
+        {'id': 'p2', 'tags': ['a']},
+    ]
@@ -0,0 +1,39 @@
+import io
+import json
+
+import pytest
+
+from app.s3.importer import iter_json_rows
+
+ROWS = [{"name": f"item {i}", "tags": ["a", "b"], "note": "comma, ] and } inside"} for i in range(20)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 64 * 1024])
+def test_json_array_across_chunk_boundaries(chunk_size):
+    text = io.StringIO('  [\n' + ',\n'.join(json.dumps(row) for row in ROWS) + '\n]\n')
+    assert list(iter_json_rows(text, chunk_size=chunk_size)) == ROWS
+
+
+@pytest.mark.parametrize("chunk_size", [5, 64 * 1024])
+def test_ndjson_skips_blank_lines(chunk_size):
+    text = io.StringIO('\n'.join(json.dumps(row) for row in ROWS[:3]) + '\n\n' + json.dumps(ROWS[3]))
+    assert list(iter_json_rows(text, chunk_size=chunk_size)) == ROWS[:4]
+
+
+def test_empty_array():
+    assert list(iter_json_rows(io.StringIO('[]'))) == []
+
+
+def test_oversized_element_raises_instead_of_buffering_the_file():
+    text = io.StringIO('[{"name": "' + 'x' * 5000)
+    with pytest.raises(ValueError):
+        list(iter_json_rows(text, chunk_size=100, max_object_size=1000))
+
+
+def test_truncated_array_raises():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_rows(io.StringIO('[{"name": "a"}, {"name": '), chunk_size=8))
+
+
+def test_scalar_split_across_chunks_is_not_cut_short():
+    assert list(iter_json_rows(io.StringIO('[12345, true, {"a": 1}]'), chunk_size=3)) == [12345, True, {"a": 1}]
@@ -0,0 +1,45 @@
+from collections import Counter
+
+from app.sqs.worker import LaneScheduler
+
+
+def test_busy_lanes_share_receives_by_weight():
+    scheduler = LaneScheduler({"high": 3, "normal": 1}, idle_recheck=60)
+    for lane in ("high", "normal"):
+        scheduler.report(lane, 10)
+    turns = Counter()
+    for _ in range(40):
+        lane, long_poll = scheduler.next_lane()
+        assert not long_poll
+        turns[lane] += 1
+        scheduler.report(lane, 10)
+    assert turns == {"high": 30, "normal": 10}
+
+
+def test_empty_lane_gives_its_turns_to_busy_lanes():
+    scheduler = LaneScheduler({"high": 3, "normal": 1}, idle_recheck=60)
+    scheduler.report("high", 0)
+    scheduler.report("normal", 5)
+    lanes = set()
+    for _ in range(10):
+        lane, long_poll = scheduler.next_lane()
+        lanes.add(lane)
+        assert not long_poll
+        scheduler.report(lane, 5)
+    assert lanes == {"normal"}
+
+
+def test_idle_lanes_are_long_polled_in_turn_and_rechecked():
+    scheduler = LaneScheduler({"high": 3, "normal": 1}, idle_recheck=0)
+    turns = Counter()
+    for _ in range(8):
+        lane, long_poll = scheduler.next_lane()
+        assert long_poll
+        turns[lane] += 1
+        scheduler.report(lane, 0)
+    assert turns == {"high": 6, "normal": 2}
+
+    # with no recheck delay, an empty lane is polled again as soon as another lane has work
+    scheduler.report("normal", 1)
+    seen = {scheduler.next_lane()[0] for _ in range(4)}
+    assert seen == {"high", "normal"}
@@ -0,0 +1,52 @@
+from app.s3.service import BulkDataService
+
+
+class FakeBucket:
+    # list_files_page over an in-memory key set with S3's ordering, prefix and StartAfter semantics
+    def __init__(self, keys):
+        self.keys = sorted(keys)
+        self.calls = 0
+
+    def list_files_page(self, prefix='', max_keys=1000, continuation_token=None, start_after=None):
+        self.calls += 1
+        matching = [key for key in self.keys if key.startswith(prefix) and (not start_after or key > start_after)]
+        files = [{'key': key, 'size': 1, 'last_modified': '', 'etag': ''} for key in matching[:max_keys]]
+        return {'files': files, 'next_token': 'more' if len(matching) > max_keys else None}
+
+
+def make_service(keys):
+    service = BulkDataService.__new__(BulkDataService)
+    service.s3_client = FakeBucket(keys)
+    service.manifest = None
+    return service
+
+
+def list_all(service, **kwargs):
+    keys, cursor, pages = [], None, 0
+    while True:
+        page = service.list_files(cursor=cursor, **kwargs)
+        pages += 1
+        keys.extend(file['key'] for file in page['files'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return keys, pages
+
+
+def test_sidecars_never_produce_empty_pages():
+    uploads = [f'uploads/2024/05/0{day}/120000_abcd1234_{day}.csv' for day in range(1, 6)]
+    legacy = ['20230101_120000_abcd1234_old.csv']
+    internal = [f'_meta/{key}.json' for key in uploads] + [f'_digests/{n:064x}.json' for n in range(50)] + \
+        ['snapshots/products/latest.json']
+    service = make_service(uploads + legacy + internal)
+
+    page = service.list_files(limit=2)
+    assert [file['key'] for file in page['files']] == legacy + uploads[:1]
+
+    keys, pages = list_all(service, limit=2)
+    assert keys == legacy + uploads
+    assert pages == 3
+
+
+def test_internal_prefix_lists_nothing():
+    service = make_service(['_meta/uploads/a.csv.json'])
+    assert service.list_files(prefix='_meta/') == {'files': [], 'next_cursor': None}
@@ -0,0 +1,52 @@
+import json
+import os
+import time
+
+from app.notifications.outbox import NotificationOutbox
+
+
+def journal_pending(path):
+    pending = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if 'ack' in record:
+                pending.pop(record['ack'], None)
+            else:
+                pending[record['seq']] = record['event']
+    return pending
+
+
+def wait_for(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_events_stay_journaled_until_delivery_is_confirmed(tmp_path):
+    calls = []
+    outbox = NotificationOutbox(lambda event, done: calls.append((event, done)), spill_dir=str(tmp_path), max_attempts=2)
+    outbox.put({"action": "created", "resource": "a"})
+    outbox.put({"action": "created", "resource": "b"})
+    assert wait_for(lambda: len(calls) == 2)
+
+    # handed off but not yet accepted: both are still pending in the journal
+    assert len(journal_pending(outbox.journal.path)) == 2
+    assert outbox.get_stats()["in_flight"] == 2
+
+    calls[0][1](True)
+    assert len(journal_pending(outbox.journal.path)) == 1
+
+    # a failed delivery is retried rather than acked
+    calls[1][1](False)
+    assert wait_for(lambda: len(calls) == 3)
+    assert calls[2][0]["resource"] == "b"
+    assert len(journal_pending(outbox.journal.path)) == 1
+
+    calls[2][1](True)
+    outbox.close(timeout=1)
+    assert not os.path.exists(outbox.journal.path)
+    assert outbox.get_stats()["delivered"] >= 2
@@ -0,0 +1,41 @@
+import pytest
+
+from app import rate_limit
+from app.rate_limit import TokenBucketLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_burst_then_refill_at_rate(clock):
+    limiter = TokenBucketLimiter(rate=2, burst=4)
+    assert all(limiter.acquire("alice")[0] for _ in range(4))
+    allowed, retry_after = limiter.acquire("alice")
+    assert not allowed and retry_after == pytest.approx(0.5)
+
+    clock[0] += 0.5
+    assert limiter.acquire("alice") == (True, 0.0)
+    # other principals have their own bucket
+    assert limiter.acquire("bob") == (True, 0.0)
+
+
+def test_cost_is_capped_at_burst(clock):
+    limiter = TokenBucketLimiter(rate=1, burst=3)
+    assert limiter.acquire("alice", cost=10) == (True, 0.0)
+    allowed, retry_after = limiter.acquire("alice", cost=10)
+    assert not allowed and retry_after == pytest.approx(3)
+
+
+def test_least_recently_seen_principal_is_evicted(clock):
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_principals=2)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("a")
+    limiter.acquire("c")
+    # "b" was evicted, so it starts again with a full bucket
+    assert limiter.acquire("b") == (True, 0.0)
+    assert not limiter.acquire("c")[0]
@@ -0,0 +1,45 @@
+from app.s3.service import BulkDataService
+
+
+class FakeS3:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def get_file_metadata(self, file_key):
+        metadata = self.objects.get(file_key)
+        if metadata is None:
+            return None
+        return {'key': file_key, 'size': 10, 'content_type': 'text/csv',
+                'last_modified': '2026-01-01T00:00:00+00:00', 'etag': 'x', 'metadata': metadata}
+
+
+def make_service(objects):
+    service = BulkDataService.__new__(BulkDataService)
+    service.s3_client = FakeS3(objects)
+    service.manifest = None
+    service.allowed_file_types = {'csv': 'text/csv'}
+    service.scan_in_background = lambda file_key: True
+    return service
+
+
+KEY = 'uploads/2026/01/01/120000_abcd1234_items.csv'
+
+
+def test_owner_can_register_their_upload():
+    service = make_service({KEY: {'uploaded-by': 'ana@example.com', 'original-filename': 'items.csv'}})
+    result = service.register_upload(KEY, 'ana@example.com')
+    assert result['success'] and result['uploaded_by'] == 'ana@example.com'
+
+
+def test_other_users_cannot_register_it():
+    service = make_service({KEY: {'uploaded-by': 'ana@example.com'}})
+    assert service.register_upload(KEY, 'bob@example.com')['code'] == 'FORBIDDEN'
+    assert service.register_upload(KEY, None)['code'] == 'FORBIDDEN'
+
+
+def test_keys_outside_the_upload_prefix_are_rejected():
+    service = make_service({'_meta/uploads/x.csv': {'uploaded-by': 'ana@example.com'},
+                            '20230101_120000_abcd1234_old.csv': {'uploaded-by': 'ana@example.com'}})
+    for key in ('_meta/uploads/x.csv', '20230101_120000_abcd1234_old.csv'):
+        assert service.register_upload(key, 'ana@example.com')['code'] == 'INVALID_FILE_KEY'
+    assert service.register_upload('uploads/missing.csv', 'ana@example.com')['code'] == 'FILE_NOT_FOUND'
@@ -0,0 +1,41 @@
+import csv
+import io
+
+import pytest
+
+from app.s3.service import RowCounter
+
+
+def count(data: bytes, chunk_size: int) -> int:
+    counter = RowCounter()
+    for offset in range(0, len(data), chunk_size):
+        counter.update(data[offset:offset + chunk_size])
+    assert counter.size == len(data)
+    return counter.rows
+
+
+def dict_reader_rows(data: bytes) -> int:
+    return sum(1 for _ in csv.DictReader(io.StringIO(data.decode('utf-8'), newline='')))
+
+
+CASES = [
+    b'',
+    b'id,name\n',
+    b'id,name\n1,a\n2,b\n',
+    b'id,name\n1,a\n2,b',
+    b'id,name\r\n1,a\r\n2,b\r\n',
+    b'id,name\n1,"multi\nline"\n2,"quoted ""escape"", with comma"\n',
+    b'id,name\n\n1,a\n\r\n\n2,b\n\n',
+    b'id,name\n1,"a\n\nb"\n2,""\n',
+]
+
+
+@pytest.mark.parametrize("data", CASES)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1024])
+def test_matches_dict_reader_across_chunk_boundaries(data, chunk_size):
+    assert count(data, chunk_size) == dict_reader_rows(data)
+
+
+def test_large_quoted_file():
+    data = b'id,desc\n' + b''.join(b'%d,"line one\nline two"\n' % i for i in range(10000))
+    assert count(data, 4096) == 10000
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from app.sqs.worker import VisibilityTracker
+
+
+def test_claim_due_returns_only_handles_near_their_deadline():
+    tracker = VisibilityTracker(visibility_timeout=30)
+    tracker.track("queue-a", ["a1", "a2"])
+    assert tracker.claim_due(margin=10) == {}
+    assert tracker.claim_due(margin=31) == {"queue-a": ["a1", "a2"]}
+    tracker.release(["a1", "a2"])
+
+    tracker.extended(["a1"], 120)
+    assert tracker.claim_due(margin=31) == {"queue-a": ["a2"]}
+    tracker.release(["a2"])
+
+
+def test_untracked_handles_are_not_extended():
+    tracker = VisibilityTracker(visibility_timeout=30)
+    tracker.track("queue", ["h"])
+    tracker.untrack("h")
+    tracker.extended(["h"], 120)
+    assert len(tracker) == 0
+    assert tracker.claim_due(margin=60) == {}
+
+
+def test_take_waits_for_an_in_flight_extension():
+    tracker = VisibilityTracker(visibility_timeout=30)
+    tracker.track("queue", ["h"])
+    assert tracker.claim_due(margin=60) == {"queue": ["h"]}
+
+    taken = threading.Event()
+    thread = threading.Thread(target=lambda: (tracker.take(["h"]), taken.set()))
+    thread.start()
+    time.sleep(0.05)
+    assert not taken.is_set()
+
+    tracker.extended(["h"], 120)
+    tracker.release(["h"])
+    assert taken.wait(1)
+    thread.join()
+    assert len(tracker) == 0
@@ -0,0 +1,53 @@
+import io
+import zipfile
+
+import pytest
+
+from app.s3.xlsx_reader import SharedStrings, XlsxReader, iter_xlsx_dict_rows
+
+WORKBOOK = '''<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+ xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Products" sheetId="1" r:id="rId1"/></sheets></workbook>'''
+RELS = '''<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>'''
+MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+
+
+def make_workbook(strings, rows):
+    # rows are lists of shared string indexes or numbers
+    shared = ''.join(f'<si><t>{text}</t></si>' for text in strings)
+    cells = []
+    for number, row in enumerate(rows, start=1):
+        values = ''.join(
+            f'<c r="{chr(65 + column)}{number}" t="s"><v>{value}</v></c>' if isinstance(value, str)
+            else f'<c r="{chr(65 + column)}{number}"><v>{value}</v></c>'
+            for column, value in enumerate(row))
+        cells.append(f'<row r="{number}">{values}</row>')
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('xl/workbook.xml', WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', RELS)
+        archive.writestr('xl/sharedStrings.xml', f'<sst xmlns="{MAIN}">{shared}</sst>')
+        archive.writestr('xl/worksheets/sheet1.xml', f'<worksheet xmlns="{MAIN}"><sheetData>{"".join(cells)}</sheetData></worksheet>')
+    buffer.seek(0)
+    return buffer
+
+
+def test_shared_strings_spill_past_the_memory_limit():
+    strings = SharedStrings(memory_limit=200)
+    texts = [f'value {i} ü' for i in range(50)]
+    for text in texts:
+        strings.append(text)
+    assert strings._spill is not None
+    assert len(strings) == 50
+    assert [strings[i] for i in reversed(range(50))] == list(reversed(texts))
+    with pytest.raises(IndexError):
+        strings[50]
+    strings.close()
+
+
+@pytest.mark.parametrize("memory", [0, None])
+def test_rows_resolve_shared_strings_in_memory_or_spilled(memory):
+    workbook = make_workbook(['name', 'price', 'Widget', 'Gadget'], [['0', '1'], ['2', 3.0], ['3', 4.5]])
+    reader = XlsxReader(workbook, shared_strings_memory=memory)
+    assert list(iter_xlsx_dict_rows(reader)) == [{'name': 'Widget', 'price': '3'}, {'name': 'Gadget', 'price': '4.5'}]